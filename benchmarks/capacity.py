@@ -0,0 +1,253 @@
+"""Load-generator capacity benchmark.
+
+Runs the Onebrief scenario against the local mock server (fixed latency) at
+increasing user counts, measures the load generator at each step and finds
+the highest count it can drive before it, rather than the target, becomes
+the bottleneck:
+
+    python -m benchmarks.capacity --users 1,2,4,8,16 --run-time 120
+
+Setup and the runs work in a temporary directory, so the mock accounts and
+plans never overwrite the real setup files in the repository.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import socket
+import argparse
+import subprocess
+import statistics
+import tempfile
+from datetime import datetime
+from pathlib import Path
+import psutil
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+# Written by setup.py into its working directory; --skip-setup copies the repository's
+SETUP_FILES = ("supervisor_cookies.json", "account_pool.json", "shards.json")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise TimeoutError(f"Nothing listening on port {port}")
+
+
+class ProcessTreeSampler:
+    """CPU, memory and Chromium process count of a process and its children.
+
+    CPU time is summed per pid from the last sample each process was seen in,
+    so processes that exit during the run still count.
+    """
+
+    def __init__(self, pid: int):
+        self.root = psutil.Process(pid)
+        self.cpu_seconds = {}
+        self.rss_mb = []
+        self.chromium_processes = []
+        self.started = time.time()
+
+    def sample(self):
+        try:
+            processes = [self.root] + self.root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+        rss = 0
+        chromium = 0
+        for p in processes:
+            try:
+                times = p.cpu_times()
+                self.cpu_seconds[p.pid] = times.user + times.system
+                rss += p.memory_info().rss
+                if "chrom" in p.name().lower() or "headless_shell" in p.name():
+                    chromium += 1
+            except psutil.Error:
+                continue
+        self.rss_mb.append(rss / 1024 / 1024)
+        self.chromium_processes.append(chromium)
+
+    def summary(self) -> dict:
+        elapsed = time.time() - self.started
+        return {
+            "cores_used": sum(self.cpu_seconds.values()) / elapsed if elapsed else 0,
+            "locust_cpu_percent": None,  # Filled in from the locust process alone
+            "rss_mb_mean": statistics.mean(self.rss_mb) if self.rss_mb else 0,
+            "rss_mb_peak": max(self.rss_mb, default=0),
+            "chromium_processes_peak": max(self.chromium_processes, default=0),
+        }
+
+
+def read_locust_stats(csv_prefix: str) -> dict:
+    """Aggregated row of the locust --csv stats file"""
+    with open(f"{csv_prefix}_stats.csv") as f:
+        rows = list(csv.DictReader(f))
+    total = next((r for r in rows if r["Name"] == "Aggregated"), {})
+    tasks = [r for r in rows if r["Type"] == "TASK"]
+    return {
+        "requests": int(total.get("Request Count", 0)),
+        "failures": int(total.get("Failure Count", 0)),
+        "requests_per_s": float(total.get("Requests/s", 0)),
+        "task_p95_ms": float(tasks[0]["95%"]) if tasks and tasks[0]["95%"] != "N/A" else None,
+    }
+
+
+def prepare_workdir(workdir: Path, skip_setup: bool):
+    """Copies the scenario, and with --skip-setup the existing setup files, into the run's directory"""
+    for name in ("scenario.json",) + (SETUP_FILES if skip_setup else ()):
+        if (ROOT / name).exists():
+            shutil.copy(ROOT / name, workdir / name)
+
+
+def run_step(users: int, args, env: dict, step_dir: Path, workdir: Path) -> dict:
+    """One locust run at a fixed user count, sampled while it runs"""
+    csv_prefix = str(step_dir / f"users-{users}")
+    probe_output = step_dir / f"users-{users}-probe.json"
+    command = [
+        sys.executable, "-m", "locust",
+        "-f", f"{ROOT / 'locustfile.py'},{ROOT / 'benchmarks' / 'probe.py'}",
+        "--headless", "--only-summary",
+        "-u", str(users), "-r", str(args.spawn_rate),
+        "--run-time", f"{args.run_time}s",
+        "--csv", csv_prefix,
+    ]
+    locust = subprocess.Popen(
+        command,
+        cwd=workdir,
+        env={**env, "CAPACITY_PROBE_OUTPUT": str(probe_output)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    sampler = ProcessTreeSampler(locust.pid)
+    locust_process = psutil.Process(locust.pid)
+    locust_process.cpu_percent()
+    locust_cpu = []
+    while locust.poll() is None:
+        time.sleep(1)
+        sampler.sample()
+        try:
+            locust_cpu.append(locust_process.cpu_percent())
+        except psutil.Error:
+            pass
+
+    result = {"users": users, **sampler.summary()}
+    result["locust_cpu_percent"] = statistics.mean(locust_cpu) if locust_cpu else 0
+    result.update(read_locust_stats(csv_prefix))
+    if probe_output.exists():
+        result.update(json.loads(probe_output.read_text()))
+    return result
+
+
+def saturated(step: dict, args) -> list[str]:
+    """Reasons why the load generator (not the target) limited this step"""
+    reasons = []
+    if step["locust_cpu_percent"] > args.max_locust_cpu:
+        reasons.append(f"locust process at {step['locust_cpu_percent']:.0f}% CPU")
+    if step["cores_used"] > psutil.cpu_count() * args.max_total_cpu / 100:
+        reasons.append(f"{step['cores_used']:.1f} of {psutil.cpu_count()} cores busy")
+    lag = step.get("asyncio_lag_ms", {}).get("p95", 0)
+    if lag > args.max_lag:
+        reasons.append(f"asyncio loop lag p95 {lag:.0f} ms")
+    if step.get("task_skew_cv", 0) > args.max_skew:
+        reasons.append(f"task skew {step['task_skew_cv']:.2f}")
+    return reasons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-generator capacity benchmark")
+    parser.add_argument("--users", default="1,2,4,8,16", help="Comma-separated user counts")
+    parser.add_argument("--run-time", type=int, default=120, help="Seconds per step")
+    parser.add_argument("--spawn-rate", type=float, default=1)
+    parser.add_argument("--latency", type=float, default=50, help="Mock server /api latency in ms")
+    parser.add_argument("--max-locust-cpu", type=float, default=85, help="Percent of one core")
+    parser.add_argument("--max-total-cpu", type=float, default=85, help="Percent of all cores")
+    parser.add_argument("--max-lag", type=float, default=50, help="asyncio loop lag p95 in ms")
+    parser.add_argument("--max-skew", type=float, default=0.5, help="Coefficient of variation")
+    parser.add_argument(
+        "--skip-setup", action="store_true", help="Use copies of the repository's setup files"
+    )
+    args = parser.parse_args()
+
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    step_dir = RESULTS_DIR / stamp
+    step_dir.mkdir(parents=True, exist_ok=True)
+
+    port = free_port()
+    env = {
+        **os.environ,
+        "HOST_URL": f"http://127.0.0.1:{port}",
+        # The helpers are imported from the repository, whatever the working directory
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "mock_server.server", "--port", str(port), "--latency", str(args.latency)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    steps = []
+    workdir = tempfile.TemporaryDirectory(prefix="capacity-")
+    try:
+        wait_for_port(port)
+        prepare_workdir(Path(workdir.name), args.skip_setup)
+        if not args.skip_setup:
+            subprocess.run(
+                [sys.executable, str(ROOT / "setup.py")], cwd=workdir.name, env=env, check=True
+            )
+
+        for users in [int(u) for u in args.users.split(",")]:
+            print(f"⏱️ Running {users} users for {args.run_time}s...")
+            step = run_step(users, args, env, step_dir, Path(workdir.name))
+            step["saturated_by"] = saturated(step, args)
+            steps.append(step)
+            print(
+                f"   cores={step['cores_used']:.2f} locust_cpu={step['locust_cpu_percent']:.0f}% "
+                f"rss={step['rss_mb_peak']:.0f}MB chromium={step['chromium_processes_peak']} "
+                f"lag_p95={step.get('asyncio_lag_ms', {}).get('p95', 0):.0f}ms "
+                f"skew={step.get('task_skew_cv', 0):.2f} {'⚠️ ' + ', '.join(step['saturated_by']) if step['saturated_by'] else ''}"
+            )
+            if step["saturated_by"]:
+                break
+    finally:
+        server.terminate()
+        workdir.cleanup()
+
+    sustainable = [s for s in steps if not s["saturated_by"]]
+    best = sustainable[-1] if sustainable else None
+    users_per_core = best["users"] / best["cores_used"] if best and best["cores_used"] else None
+    report = {
+        "timestamp": stamp,
+        "cpu_count": psutil.cpu_count(),
+        "settings": vars(args),
+        "steps": steps,
+        "max_sustainable_users": best["users"] if best else 0,
+        "recommended_users_per_core": users_per_core,
+    }
+    output = RESULTS_DIR / f"capacity-{stamp}.json"
+    output.write_text(json.dumps(report, indent=2))
+
+    print(f"\n📈 Capacity curve (users -> cores used):")
+    for s in steps:
+        print(f"   {s['users']:>4} -> {s['cores_used']:.2f}")
+    if users_per_core:
+        print(f"✅ {best['users']} users sustainable, ~{users_per_core:.1f} users per core")
+    else:
+        print("❌ Even the smallest step saturated the load generator")
+    print(f"Results: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Load-generator self-measurements for the capacity benchmark.
+
+Load it next to the real locustfile:
+    locust -f locustfile.py,benchmarks/probe.py ...
+It measures how late the gevent hub and the Playwright asyncio loop wake up
+from a short sleep (lag), and the TASK times of every virtual user, and
+writes a summary to $CAPACITY_PROBE_OUTPUT when the test stops.
+"""
+import os
+import json
+import time
+import asyncio
+import statistics
+from collections import defaultdict
+import gevent
+from locust import events
+import locust_plugins.users.playwright as pw_plugin
+
+LAG_INTERVAL = 0.1  # Seconds between lag samples
+
+gevent_lag_ms = []
+asyncio_lag_ms = []
+task_times_ms = defaultdict(list)  # user ordinal -> TASK response times
+running = False
+
+
+def measure_gevent_lag():
+    while running:
+        start = time.perf_counter()
+        gevent.sleep(LAG_INTERVAL)
+        gevent_lag_ms.append((time.perf_counter() - start - LAG_INTERVAL) * 1000)
+
+
+async def measure_asyncio_lag():
+    while running:
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        asyncio_lag_ms.append((time.perf_counter() - start - LAG_INTERVAL) * 1000)
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+@events.test_start.add_listener
+def start_probe(environment, **kwargs):
+    global running
+    running = True
+    gevent.spawn(measure_gevent_lag)
+    asyncio.run_coroutine_threadsafe(measure_asyncio_lag(), pw_plugin.loop)
+
+
+@events.request.add_listener
+def record_task_time(request_type, response_time, context, **kwargs):
+    if request_type == "TASK":
+        task_times_ms[(context or {}).get("user_ordinal")].append(response_time)
+
+
+@events.test_stop.add_listener
+def write_probe_summary(environment, **kwargs):
+    global running
+    running = False
+
+    user_means = [statistics.mean(times) for times in task_times_ms.values() if times]
+    summary = {
+        "gevent_lag_ms": {"p50": percentile(gevent_lag_ms, 50), "p95": percentile(gevent_lag_ms, 95)},
+        "asyncio_lag_ms": {"p50": percentile(asyncio_lag_ms, 50), "p95": percentile(asyncio_lag_ms, 95)},
+        "task_ms_per_user": {str(k): statistics.mean(v) for k, v in task_times_ms.items() if v},
+        # Spread of the users' mean task times: 0 means every user ran at the same pace
+        "task_skew_cv": (
+            statistics.pstdev(user_means) / statistics.mean(user_means)
+            if len(user_means) > 1
+            else 0.0
+        ),
+    }
+    path = os.environ.get("CAPACITY_PROBE_OUTPUT")
+    if path:
+        with open(path, "w") as f:
+            json.dump(summary, f, indent=2)
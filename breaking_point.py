@@ -0,0 +1,218 @@
+"""Breaking-point search: raises the number of Onebrief users until the SLOs break.
+
+Run it next to the locustfile, headless for a nightly check:
+
+    locust -f locustfile.py,breaking_point.py --headless --bp-expect-users 40
+
+Each step ramps to a user count and holds it for BREAKING_POINT_HOLD seconds;
+the step passes when every SLO in BREAKING_POINT_SLOS and the failure ratio
+hold over the samples of that step alone. Steps go up by BREAKING_POINT_STEP
+until one fails, then (in "binary" mode) the search bisects between the last
+passing and the first failing count. The highest passing count and the
+evidence of every step are written to RESULTS_DIR/breaking-point-<time>.json.
+"""
+import os
+import json
+import time
+from collections import Counter
+from locust import LoadTestShape, events
+from locust.stats import calculate_response_time_percentile
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger("breaking_point")
+
+
+@events.init_command_line_parser.add_listener
+def add_arguments(parser):
+    group = parser.add_argument_group("Breaking-point search")
+    group.add_argument("--bp-start", type=int, default=BREAKING_POINT_START, help="First step's users")
+    group.add_argument("--bp-step", type=int, default=BREAKING_POINT_STEP, help="Users added per step")
+    group.add_argument("--bp-max", type=int, default=BREAKING_POINT_MAX, help="Never go above this")
+    group.add_argument("--bp-hold", type=int, default=BREAKING_POINT_HOLD, help="Seconds to hold each step")
+    group.add_argument(
+        "--bp-expect-users",
+        type=int,
+        default=0,
+        help="Exit with code 1 if fewer users than this are sustainable (nightly regression check)",
+    )
+
+
+def window_times(current: dict, baseline: dict) -> Counter:
+    """The response times recorded since `baseline` was taken"""
+    times = Counter(current)
+    times.subtract(baseline)
+    return +times  # Drops the non-positive counts, e.g. after a stats reset
+
+
+class BreakingPointShape(LoadTestShape):
+    """Step, then binary, search for the highest user count that meets the SLOs"""
+
+    def __init__(self):
+        super().__init__()
+        self.steps = []
+        self.good = 0  # Highest count that passed
+        self.bad = None  # Lowest count that failed
+        self.target = None
+        self.phase = None  # "ramp" or "hold"
+        self.phase_start = None
+        self.ramp_s = 0
+        self.baseline = None
+        self.written = False
+
+    @property
+    def options(self):
+        return self.runner.environment.parsed_options
+
+    def snapshot(self) -> dict:
+        """Response times and counts of every stats entry, to diff a step against"""
+        return {
+            key: (dict(entry.response_times), entry.num_requests, entry.num_failures)
+            for key, entry in self.runner.stats.entries.items()
+        }
+
+    def start_step(self, users: int):
+        self.target = users
+        self.phase = "ramp"
+        self.phase_start = time.monotonic()
+        self.baseline = self.snapshot()
+        logger.info(f"🪜 Step to {users} users")
+
+    def evaluate(self, ramp_s: float) -> dict:
+        """The evidence of the step that just ended and whether it passed"""
+        slos = []
+        for slo in BREAKING_POINT_SLOS:
+            times = Counter()
+            for (name, request_type), entry in self.runner.stats.entries.items():
+                if request_type == slo["type"] and (
+                    name == slo["name"] or name.endswith(f" > {slo['name']}")
+                ):
+                    baseline_times = self.baseline.get((name, request_type), ({}, 0, 0))[0]
+                    times += window_times(entry.response_times, baseline_times)
+            samples = sum(times.values())
+            value = calculate_response_time_percentile(times, samples, slo["percentile"] / 100)
+            slos.append(
+                {
+                    **slo,
+                    "samples": samples,
+                    "value_ms": value,
+                    # Too few samples is no evidence either way
+                    "ok": samples < BREAKING_POINT_MIN_SAMPLES or value <= slo["max_ms"],
+                }
+            )
+
+        requests = failures = 0
+        for key, entry in self.runner.stats.entries.items():
+            if key[1] in BREAKING_POINT_FAILURE_TYPES:
+                _, base_requests, base_failures = self.baseline.get(key, ({}, 0, 0))
+                requests += max(entry.num_requests - base_requests, 0)
+                failures += max(entry.num_failures - base_failures, 0)
+        failure_ratio = failures / requests if requests else 0
+
+        reasons = [
+            f"{s['type']} {s['name']} p{s['percentile']} {s['value_ms']:.0f} ms > {s['max_ms']} ms"
+            for s in slos
+            if not s["ok"]
+        ]
+        if failure_ratio > BREAKING_POINT_MAX_FAILURE_RATIO:
+            reasons.append(f"failure ratio {failure_ratio:.1%} > {BREAKING_POINT_MAX_FAILURE_RATIO:.1%}")
+        return {
+            "users": self.target,
+            "reached_users": self.runner.user_count,
+            "ramp_s": round(ramp_s, 1),
+            "hold_s": self.options.bp_hold,
+            "slos": slos,
+            "requests": requests,
+            "failures": failures,
+            "failure_ratio": failure_ratio,
+            "ok": not reasons,
+            "reasons": reasons,
+        }
+
+    def next_target(self, step: dict):
+        """The next user count to try, None when the search is over"""
+        if step["ok"]:
+            self.good = max(self.good, step["users"])
+        else:
+            self.bad = min(self.bad or step["users"], step["users"])
+
+        if self.bad is None:  # Still stepping up
+            users = step["users"] + self.options.bp_step
+            return users if users <= self.options.bp_max else None
+        if BREAKING_POINT_SEARCH != "binary" or self.bad - self.good <= BREAKING_POINT_RESOLUTION:
+            return None
+        return (self.good + self.bad) // 2
+
+    def tick(self):
+        if self.target is None:
+            self.start_step(self.options.bp_start)
+
+        now = time.monotonic()
+        if self.phase == "ramp":
+            count = self.runner.user_count
+            going_up = not self.steps or self.target >= self.steps[-1]["users"]
+            reached = count >= self.target if going_up else count <= self.target
+            # Users that never manage to start should not stall the search
+            if reached or now - self.phase_start > BREAKING_POINT_MAX_RAMP:
+                self.ramp_s = now - self.phase_start
+                self.phase = "hold"
+                self.phase_start = now
+        elif now - self.phase_start >= self.options.bp_hold:
+            step = self.evaluate(self.ramp_s)
+            self.steps.append(step)
+            logger.info(
+                f"{'✅' if step['ok'] else '❌'} {step['users']} users: "
+                + (", ".join(step["reasons"]) or f"{step['requests']} requests, SLOs met")
+            )
+            users = self.next_target(step)
+            if users is None:
+                self.finish()
+                return None
+            self.start_step(users)
+
+        return self.target, BREAKING_POINT_SPAWN_RATE
+
+    def report(self) -> dict:
+        return {
+            "host": self.runner.environment.host,
+            "search": BREAKING_POINT_SEARCH,
+            "slos": BREAKING_POINT_SLOS,
+            "max_failure_ratio": BREAKING_POINT_MAX_FAILURE_RATIO,
+            "max_sustainable_users": self.good,
+            "first_failing_users": self.bad,
+            "steps": self.steps,
+        }
+
+    def finish(self):
+        """Writes the report and sets the exit code for the nightly check"""
+        if self.written:
+            return
+        self.written = True
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"breaking-point-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+        if self.bad is None:
+            logger.info(f"📈 No breaking point up to {self.good} users")
+        else:
+            logger.info(f"📈 {self.good} users sustainable, SLOs broke at {self.bad}")
+        logger.info(f"📄 Evidence written to {path}")
+
+        expected = self.options.bp_expect_users
+        if expected:
+            regressed = self.good < expected
+            self.runner.environment.process_exit_code = 1 if regressed else 0
+            if regressed:
+                logger.error(f"❌ Capacity regression: {self.good} users sustainable, expected {expected}")
+        else:
+            # Failures are expected past the breaking point; they don't fail the run
+            self.runner.environment.process_exit_code = 0
+
+
+@events.test_stop.add_listener
+def write_partial_report(environment, **kwargs):
+    """Keeps the evidence of the finished steps when the search is stopped early."""
+    shape = environment.shape_class
+    if isinstance(shape, BreakingPointShape) and shape.steps:
+        shape.finish()
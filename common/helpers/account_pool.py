@@ -0,0 +1,175 @@
+import os
+import json
+import asyncio
+from collections import deque
+from playwright.async_api import Browser, Page
+from common.helpers.playwright import (
+    register_user,
+    login,
+    is_logged_in,
+    link_user_to_plan_api,
+    get_plan_id_from_url,
+)
+from common.helpers.plan_linker import PlanLinkError
+from common.helpers.interception import apply_interception_profile
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+
+def load_account_pool(path: str = ACCOUNT_POOL_FILE) -> dict:
+    """Reads the persisted account pool, or returns an empty one"""
+    if not os.path.exists(path):
+        return {"shared_plan_url": None, "accounts": []}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def account_plan_ids(account: dict) -> list[int]:
+    """The plans the account is linked to (pools from before sharding have one)"""
+    if "plan_ids" in account:
+        return account["plan_ids"]
+    return [account["plan_id"]] if account.get("plan_id") else []
+
+
+def load_plan_accounts(shared_plan_url: str, path: str = ACCOUNT_POOL_FILE):
+    """Returns the persisted accounts that are linked to the given plan"""
+    plan_id = get_plan_id_from_url(shared_plan_url)
+    accounts = load_account_pool(path)["accounts"]
+    return [a for a in accounts if plan_id in account_plan_ids(a)]
+
+
+def save_account_pool(pool: dict, path: str = ACCOUNT_POOL_FILE):
+    """Persists the account pool (credentials, user data and storage state)"""
+    with open(path, "w") as f:
+        json.dump(pool, f, indent=2)
+
+
+async def provision_account(browser: Browser, supervisor_page: Page, plan_ids: list[int]):
+    """Registers one account in its own context and links it to the plans"""
+    context = await browser.new_context(**DEFAULT_BROWSER_OPTIONS)
+    await apply_interception_profile(context)
+    page = await context.new_page()
+    try:
+        creds = await register_user(page)
+        if not creds or "user_data" not in creds:
+            logger.error("❌ Pool account registration returned no user data")
+            return None
+
+        # Only plans whose link succeeded are recorded; reuse retries the rest
+        creds["plan_ids"] = []
+        for plan_id in plan_ids:
+            try:
+                await link_user_to_plan_api(supervisor_page, creds["user_data"]["id"], plan_id)
+            except PlanLinkError:
+                continue
+            creds["plan_ids"].append(plan_id)
+        creds["storage_state"] = await context.storage_state()
+        return creds
+    finally:
+        await context.close()
+
+
+async def refresh_account(browser: Browser, account: dict):
+    """Logs the account back in if its stored session is no longer valid"""
+    context = await browser.new_context(
+        storage_state=account["storage_state"], **DEFAULT_BROWSER_OPTIONS
+    )
+    await apply_interception_profile(context)
+    page = await context.new_page()
+    try:
+        if not await is_logged_in(page):
+            logger.info(f"🔄 Session expired for {account['username']}, logging in...")
+            await login(page, account["username"], account["password"])
+            account["storage_state"] = await context.storage_state()
+        return account
+    finally:
+        await context.close()
+
+
+async def provision_account_pool(
+    browser: Browser,
+    supervisor_page: Page,
+    plan_urls: list[str],
+    size: int = ACCOUNT_POOL_SIZE,
+    concurrency: int = ACCOUNT_POOL_CONCURRENCY,
+) -> dict:
+    """Tops the persisted pool up to `size` accounts, each linked to every plan.
+
+    `plan_urls` are the shared plan and, in sharded runs, the other shards.
+    Accounts from a previous run are reused: expired sessions are refreshed and
+    accounts are linked to the plans they are missing.
+    """
+    pool = load_account_pool()
+    plan_ids = [get_plan_id_from_url(url) for url in plan_urls]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def reuse(account):
+        async with semaphore:
+            try:
+                account = await refresh_account(browser, account)
+                linked = [p for p in account_plan_ids(account) if p in plan_ids]
+                user_id = account["user_data"]["id"]
+                for plan_id in plan_ids:
+                    if plan_id in linked:
+                        continue
+                    try:
+                        await link_user_to_plan_api(supervisor_page, user_id, plan_id)
+                    except PlanLinkError:
+                        continue
+                    linked.append(plan_id)
+                account.pop("plan_id", None)
+                account["plan_ids"] = linked
+                return account
+            except Exception as e:
+                logger.error(f"❌ Dropping pool account {account.get('username')}: {e}")
+                return None
+
+    async def create():
+        async with semaphore:
+            try:
+                return await provision_account(browser, supervisor_page, plan_ids)
+            except Exception as e:
+                logger.error(f"❌ Failed to provision pool account: {e}")
+                return None
+
+    reused = await asyncio.gather(*[reuse(a) for a in pool["accounts"][:size]])
+    accounts = [a for a in reused if a]
+    logger.info(f"♻️ Reusing {len(accounts)} pooled accounts")
+
+    missing = size - len(accounts)
+    if missing > 0:
+        logger.info(f"🏊 Registering {missing} pool accounts ({concurrency} at a time)...")
+        created = await asyncio.gather(*[create() for _ in range(missing)])
+        accounts += [a for a in created if a]
+
+    pool = {"shared_plan_url": plan_urls[0], "accounts": accounts}
+    save_account_pool(pool)
+    logger.info(f"✅ Account pool ready: {len(accounts)}/{size} accounts")
+    return pool
+
+
+class AccountPool:
+    """In-memory checkout/checkin queue over the persisted accounts."""
+
+    def __init__(self, accounts: list[dict]):
+        self._available = deque(accounts)
+
+    @classmethod
+    def for_plan(cls, shared_plan_url: str, path: str = ACCOUNT_POOL_FILE):
+        """Loads only the accounts that are linked to the given plan"""
+        return cls(load_plan_accounts(shared_plan_url, path))
+
+    def __len__(self):
+        return len(self._available)
+
+    def checkout(self):
+        """Returns an idle account, or None when the pool is exhausted"""
+        if not self._available:
+            return None
+        return self._available.popleft()
+
+    def checkin(self, account: dict):
+        """Returns an account to the pool once its session is over"""
+        self._available.append(account)
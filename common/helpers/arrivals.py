@@ -0,0 +1,108 @@
+import time
+import random
+import asyncio
+from contextlib import asynccontextmanager
+from common.helpers.metrics import fire_metric, record_gauge, set_current_user
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+
+class ArrivalDropped(Exception):
+    """A session arrived while the backlog was full"""
+
+
+class ArrivalScheduler:
+    """Open workload: session arrivals on a fixed schedule, independent of the sessions.
+
+    Arrivals are generated at `rate` per minute on an absolute schedule, so a
+    slow event loop catches up instead of lowering the rate. They wait in a
+    bounded backlog until a user is free to start the session; arrivals that
+    find the backlog full are dropped. Session times are measured from the
+    arrival, so time spent in the backlog is not hidden (no coordinated
+    omission). Everything runs on the Playwright event loop; the schedule
+    starts with the first `session()`.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        process: str = ARRIVAL_PROCESS,
+        max_backlog: int = ARRIVAL_MAX_BACKLOG,
+    ):
+        if process not in ("constant", "poisson"):
+            raise ValueError(f"Unknown arrival process: {process}")
+        self.rate = rate
+        self.process = process
+        self.max_backlog = max_backlog
+        self.arrived = 0
+        self.dropped = 0
+        self.in_flight = 0
+        self._backlog = None
+        self._task = None
+
+    def next_gap(self) -> float:
+        """Seconds until the next arrival"""
+        mean = 60 / self.rate
+        return random.expovariate(1 / mean) if self.process == "poisson" else mean
+
+    async def _generate(self):
+        set_current_user(None)  # Started from the first session, but not part of it
+        next_at = time.monotonic()
+        while True:
+            next_at += self.next_gap()
+            await asyncio.sleep(max(0, next_at - time.monotonic()))
+            self.arrived += 1
+            try:
+                self._backlog.put_nowait(next_at)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                fire_metric(
+                    "ARRIVAL",
+                    "dropped arrival",
+                    0,
+                    exception=ArrivalDropped(f"backlog full ({self.max_backlog})"),
+                )
+            record_gauge("ARRIVAL backlog", self._backlog.qsize(), "sessions")
+
+    def start(self):
+        if self._task is None:
+            self._backlog = asyncio.Queue(maxsize=self.max_backlog)
+            self._task = asyncio.ensure_future(self._generate())
+            logger.info(f"🚦 Open workload: {self.rate:g} sessions/min ({self.process})")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.get_loop().call_soon_threadsafe(self._task.cancel)
+
+    @asynccontextmanager
+    async def session(self):
+        """Waits for the next arrival, then times the session from that arrival"""
+        self.start()
+        arrived_at = await self._backlog.get()
+        record_gauge("ARRIVAL backlog", self._backlog.qsize(), "sessions")
+        fire_metric("ARRIVAL", "start delay", (time.monotonic() - arrived_at) * 1000)
+        self.in_flight += 1
+        record_gauge("ARRIVAL sessions in flight", self.in_flight, "sessions")
+        exception = None
+        try:
+            yield
+        except Exception as e:
+            exception = e
+            raise
+        finally:
+            self.in_flight -= 1
+            record_gauge("ARRIVAL sessions in flight", self.in_flight, "sessions")
+            fire_metric(
+                "ARRIVAL",
+                "session (from arrival)",
+                (time.monotonic() - arrived_at) * 1000,
+                exception=exception,
+            )
+
+    def summary(self) -> str:
+        return (
+            f"🚦 Arrivals: {self.arrived} arrived, {self.dropped} dropped, "
+            f"{self._backlog.qsize() if self._backlog else 0} still waiting"
+        )
@@ -0,0 +1,162 @@
+import os
+import re
+import time
+import random
+import weakref
+from contextlib import asynccontextmanager
+import gevent
+from playwright.async_api import BrowserContext, Page
+from common.helpers.metrics import action
+from common.helpers.client_errors import drain_client_errors
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-").lower()
+
+
+class CaptureRecorder:
+    """Saves a trace or screenshot of an action only when it is worth looking at.
+
+    In "trace" mode every context records a Playwright trace, one chunk per
+    action; the chunk of a failed or slow (over its SLO) action is saved and
+    every other chunk is discarded, so nothing grows with the run. In
+    "screenshot" mode a screenshot is taken instead, only for those actions.
+    A sample of the successful actions (CAPTURE_SUCCESS_RATE) is kept too, as
+    a baseline. Artifacts stop being saved once CAPTURE_MAX_MB are on disk.
+    """
+
+    def __init__(
+        self,
+        mode: str = CAPTURE_MODE,
+        directory: str = CAPTURE_DIR,
+        max_mb: float = CAPTURE_MAX_MB,
+        success_rate: float = CAPTURE_SUCCESS_RATE,
+    ):
+        self.mode = mode
+        self.directory = directory
+        self.max_bytes = max_mb * 1024 * 1024
+        self.success_rate = success_rate
+        self.used_bytes = None  # Counted on the first save
+        self.saved = 0
+        self.over_quota = 0
+        self._count = 0
+        self._tracing = weakref.WeakSet()  # Contexts that record a trace
+        self._in_chunk = weakref.WeakSet()  # ...and are inside an action's chunk
+
+    async def attach(self, context: BrowserContext):
+        """Starts tracing a new context (trace mode)"""
+        if self.mode != "trace":
+            return
+        try:
+            await context.tracing.start(screenshots=CAPTURE_TRACE_SCREENSHOTS, snapshots=True)
+            self._tracing.add(context)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not start tracing: {e}")
+
+    def slo_ms(self, name: str) -> float:
+        return CAPTURE_SLOS.get(name, CAPTURE_SLO_MS)
+
+    def reason(self, name: str, elapsed_ms: float, failed: bool) -> str:
+        """Why the action should be captured, None if it should not"""
+        if failed:
+            return "failed"
+        if elapsed_ms > self.slo_ms(name):
+            return "slow"
+        if self.success_rate and random.random() < self.success_rate:
+            return "sampled"
+        return None
+
+    def _room_left(self) -> bool:
+        if self.used_bytes is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.used_bytes = sum(
+                entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file()
+            )
+        if self.used_bytes < self.max_bytes:
+            return True
+        self.over_quota += 1
+        return False
+
+    def _path(self, name: str, reason: str, extension: str) -> str:
+        self._count += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        return os.path.join(
+            self.directory, f"{stamp}-{self._count:05d}-{_slug(name)}-{reason}.{extension}"
+        )
+
+    def _write(self, path: str, data: bytes):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    async def begin(self, page: Page) -> bool:
+        """Starts the action's trace chunk; False when this action is not traced"""
+        context = page.context
+        if context not in self._tracing or context in self._in_chunk:
+            return False  # Not tracing, or nested in an action that is
+        try:
+            await context.tracing.start_chunk()
+        except Exception:
+            return False
+        self._in_chunk.add(context)
+        return True
+
+    async def end(self, page: Page, chunk: bool, name: str, elapsed_ms: float, failed: bool):
+        """Saves or discards what was recorded for the action"""
+        reason = self.reason(name, elapsed_ms, failed)
+        save = reason is not None and self._room_left()
+        try:
+            if chunk:
+                self._in_chunk.discard(page.context)
+                if save:
+                    path = self._path(name, reason, "zip")
+                    await page.context.tracing.stop_chunk(path=path)  # Written by the driver
+                    self._saved(path, reason, name, os.path.getsize(path))
+                else:
+                    await page.context.tracing.stop_chunk()
+            elif save and self.mode == "screenshot" and not page.is_closed():
+                path = self._path(name, reason, "png")
+                data = await page.screenshot()
+                # Off the event loop; nobody waits for the file
+                gevent.get_hub().threadpool.spawn(self._write, path, data)
+                self._saved(path, reason, name, len(data))
+        except Exception as e:
+            logger.warning(f"⚠️ Could not capture {name}: {e}")
+
+    def _saved(self, path: str, reason: str, name: str, size: int):
+        self.used_bytes += size
+        self.saved += 1
+        logger.info(f"🎞️ {name} was {reason}, saved {path}")
+
+    def summary(self) -> str:
+        return (
+            f"🎞️ Captures: {self.saved} saved to {self.directory}/, "
+            f"{self.over_quota} skipped over the {self.max_bytes / 1024 / 1024:.0f} MB quota"
+        )
+
+
+capture_recorder = CaptureRecorder()
+
+
+@asynccontextmanager
+async def checked_action(page: Page, name: str):
+    """An `action` that ends by reporting the page's client errors and, if it
+    failed or was slow, saving a trace or screenshot of it"""
+    async with action(name):
+        start_ms = time.time() * 1000
+        chunk = CAPTURE_MODE != "off" and await capture_recorder.begin(page)
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if CLIENT_ERRORS:
+                failed = await drain_client_errors(page, start_ms) > 0 or failed
+            if CAPTURE_MODE != "off":
+                elapsed_ms = time.time() * 1000 - start_ms
+                await capture_recorder.end(page, chunk, name, elapsed_ms, failed)
@@ -0,0 +1,132 @@
+import re
+import json
+import weakref
+from playwright.async_api import BrowserContext, Page, Error
+from common.helpers.metrics import action_name, fire_metric
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+# Reports client-side errors to Python as they happen: uncaught exceptions,
+# unhandled promise rejections, console.error calls and error boundary
+# fallbacks (small subtrees added with the boundary text). Only additions are
+# looked at, never the whole document. Only the top frame reports, like the
+# pages the actions drive.
+ERROR_SENTINEL_SCRIPT = r"""
+((boundaryText) => {
+  if (window.__errorSentinel || window !== window.top) return;
+  window.__errorSentinel = true;
+  const push = (kind, message) => {
+    if (!window.__reportClientError) return;
+    window.__reportClientError({
+      kind, message: String(message).slice(0, 500), at: Date.now(), path: location.pathname,
+    }).catch(() => {});
+  };
+
+  window.addEventListener("error", (e) => {
+    if (e.target === window) push("uncaught", e.message || e.error);
+  }, true);
+  window.addEventListener("unhandledrejection", (e) => {
+    push("unhandled rejection", (e.reason && e.reason.message) || e.reason);
+  });
+  const consoleError = console.error;
+  console.error = function (...args) {
+    push("console", args.map((a) => (a && a.message) || String(a)).join(" "));
+    return consoleError.apply(this, args);
+  };
+
+  // Once per document: a boundary stays up, and re-renders would repeat it
+  let boundaryShown = false;
+  const observer = new MutationObserver((mutations) => {
+    for (const m of mutations) {
+      for (const node of m.addedNodes) {
+        if (node.nodeType !== 1 || node.childElementCount > 50) continue;
+        if (!node.textContent.includes(boundaryText)) continue;
+        if (!boundaryShown) push("error boundary", node.textContent.trim());
+        boundaryShown = true;
+        return;
+      }
+    }
+  });
+  document.addEventListener("DOMContentLoaded", () => {
+    observer.observe(document.body, { childList: true, subtree: true });
+  });
+})
+"""
+
+_IGNORE = [re.compile(pattern) for pattern in CLIENT_ERROR_IGNORE]
+
+# Page -> its errors since the last drain. Kept in Python, not in the page, so
+# a navigation (page.goto, a link) doesn't lose the previous document's errors.
+_buffers = weakref.WeakKeyDictionary()
+
+
+class ClientError(Exception):
+    pass
+
+
+class _Buffer:
+    __slots__ = ("errors", "dropped")
+
+    def __init__(self):
+        self.errors = []
+        self.dropped = 0
+
+
+def _on_client_error(source: dict, error: dict):
+    buffer = _buffers.get(source["page"])
+    if buffer is None:
+        buffer = _buffers[source["page"]] = _Buffer()
+    if len(buffer.errors) >= CLIENT_ERROR_BUFFER:
+        buffer.dropped += 1
+    else:
+        buffer.errors.append(error)
+
+
+async def install_error_sentinel(context: BrowserContext):
+    """Injects the sentinel into every page of the context"""
+    await context.expose_binding("__reportClientError", _on_client_error)
+    await context.add_init_script(
+        f"{ERROR_SENTINEL_SCRIPT}({json.dumps(CLIENT_ERROR_BOUNDARY_TEXT)})"
+    )
+
+
+async def drain_client_errors(page: Page, since_ms: float = 0):
+    """Reports the page's buffered errors as CLIENT failures of the running action.
+
+    Errors from before `since_ms` (epoch ms) happened between actions and are
+    reported as such. Returns how many were the running action's.
+    """
+    try:
+        # A round trip, so the errors the page reported before it have arrived
+        await page.evaluate("0")
+    except Error:
+        pass  # Navigating or closed; what did arrive is still reported
+    buffer = _buffers.pop(page, None)
+    if buffer is None:
+        return 0
+
+    name = action_name() or "(no action)"
+    count = 0
+    for error in buffer.errors:
+        message = f"{error['kind']}: {error['message']}"
+        if any(pattern.search(message) for pattern in _IGNORE):
+            continue
+        logger.warning(f"🐞 {message} on {error['path']}")
+        during = error["at"] >= since_ms
+        count += during
+        fire_metric(
+            "CLIENT",
+            name if during else "(between actions)",
+            0,
+            exception=ClientError(message),
+        )
+    if buffer.dropped:
+        fire_metric(
+            "CLIENT",
+            name,
+            0,
+            exception=ClientError(f"{buffer.dropped} more errors (buffer full)"),
+        )
+    return count + buffer.dropped
@@ -0,0 +1,68 @@
+import time
+import secrets
+from playwright.async_api import BrowserContext, Page
+
+# Tokens look like ⟦<author id>:<epoch ms when inserted>:<nonce>⟧.
+# Watches the document for tokens inserted by other users. Tokens already in
+# the document when the observer is armed are history, not propagation, so
+# they are only marked as seen.
+COLLAB_OBSERVER_SCRIPT = r"""
+(() => {
+  const pattern = /⟦(\d+):(\d+):(\w+)⟧/g;
+  const seen = new Set();
+  let armed = false;
+
+  const scan = (text, report) => {
+    if (!text || text.indexOf("⟦") === -1) return;
+    for (const match of text.matchAll(pattern)) {
+      if (seen.has(match[0])) continue;
+      seen.add(match[0]);
+      if (report) window.__collabTokenSeen(Number(match[1]), Number(match[2]), Date.now());
+    }
+  };
+
+  const observer = new MutationObserver((mutations) => {
+    if (!armed) return;
+    for (const m of mutations) {
+      if (m.type === "characterData") scan(m.target.data, true);
+      for (const node of m.addedNodes) scan(node.textContent, true);
+    }
+  });
+
+  window.__collabArm = () => {
+    scan(document.body.innerText, false);
+    armed = true;
+  };
+  document.addEventListener("DOMContentLoaded", () => {
+    observer.observe(document.body, { childList: true, characterData: true, subtree: true });
+  });
+})();
+"""
+
+
+def make_collab_token(user_id) -> str:
+    """A unique token stamped with the author and the insertion time"""
+    return f"⟦{user_id}:{int(time.time() * 1000)}:{secrets.token_hex(3)}⟧"
+
+
+async def install_collab_observer(context: BrowserContext, on_token_seen):
+    """Calls on_token_seen(author_id, sent_ms, seen_ms) for tokens arriving in any page"""
+
+    def binding(source, author_id, sent_ms, seen_ms):
+        on_token_seen(author_id, sent_ms, seen_ms)
+
+    await context.expose_binding("__collabTokenSeen", binding)
+    await context.add_init_script(COLLAB_OBSERVER_SCRIPT)
+
+
+async def arm_collab_observer(page: Page):
+    """Starts reporting tokens; call once the shared order has loaded"""
+    await page.evaluate("() => window.__collabArm && window.__collabArm()")
+
+
+def concurrency_bucket(count: int, size: int) -> str:
+    """Groups a concurrent-user count, e.g. 23 with size 10 -> '21-30 users'"""
+    if count <= 0:
+        return "0 users"
+    low = (count - 1) // size * size + 1
+    return f"{low}-{low + size - 1} users"
@@ -0,0 +1,154 @@
+import re
+import time
+import traceback
+from playwright.async_api import Browser, BrowserContext, Page
+from locust.exception import CatchResponseError, RescheduleTask
+from locust_plugins.users.playwright import sync
+from common.helpers.interception import apply_interception_profile
+from common.helpers.metrics import set_current_user
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+
+class ContextPool:
+    """Keeps one warm browser context per virtual user across task iterations.
+
+    The context (and its HTTP cache, service workers and booted SPA) is reused
+    until it has served `max_iterations` iterations or its JS heap grows past
+    `max_heap_mb`. A recycled context is replaced by a new one that starts from
+    the old one's storage state, so the user stays logged in.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        max_iterations: int = CONTEXT_MAX_ITERATIONS,
+        max_heap_mb: int = CONTEXT_MAX_HEAP_MB,
+        on_new_context=None,
+    ):
+        self.browser = browser
+        self.on_new_context = on_new_context  # Async callback, gets each new context
+        self.max_iterations = max_iterations
+        self.max_heap_mb = max_heap_mb
+        self.context: BrowserContext = None
+        self.page: Page = None
+        self.storage_state = None
+        self.iterations = 0
+
+    @property
+    def warm(self) -> bool:
+        """True when the current iteration runs on a reused context"""
+        return self.iterations > 0
+
+    async def acquire(self) -> Page:
+        """Returns the warm page, creating a new context when there is none"""
+        if self.page is None or self.page.is_closed():
+            self.context = await self.browser.new_context(
+                ignore_https_errors=True,
+                base_url=HOST_URL,
+                storage_state=self.storage_state,
+                **DEFAULT_BROWSER_OPTIONS,
+            )
+            await apply_interception_profile(self.context)
+            if self.on_new_context:
+                await self.on_new_context(self.context)
+            self.page = await self.context.new_page()
+            self.page.set_default_timeout(60000)
+            self.iterations = 0
+        return self.page
+
+    async def heap_mb(self) -> float:
+        """JS heap used by the page (Chromium only), 0 if unavailable"""
+        try:
+            used = await self.page.evaluate(
+                "() => performance.memory ? performance.memory.usedJSHeapSize : 0"
+            )
+            return used / 1024 / 1024
+        except Exception:
+            return 0
+
+    async def release(self, healthy: bool = True):
+        """Ends an iteration, recycling the context when it is due"""
+        self.iterations += 1
+        reason = None
+        if not healthy:
+            reason = "failed iteration"
+        elif self.iterations >= self.max_iterations:
+            reason = f"{self.iterations} iterations"
+        elif self.max_heap_mb and await self.heap_mb() > self.max_heap_mb:
+            reason = f"JS heap over {self.max_heap_mb} MB"
+
+        if reason:
+            logger.info(f"♻️ Recycling browser context ({reason})")
+            await self.close()
+
+    async def close(self):
+        if self.context is None:
+            return
+        try:
+            self.storage_state = await self.context.storage_state()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save storage state: {e}")
+        await self.context.close()
+        self.context = None
+        self.page = None
+
+
+def pooled_pw(func):
+    """Like locust_plugins' @pw, but the page comes from the user's ContextPool.
+
+    The page survives the task, so the next iteration starts warm. A failed
+    iteration recycles the context, since its state can't be trusted.
+    """
+
+    @sync
+    async def pooled_wrapper(user):
+        set_current_user(user)
+        if getattr(user, "context_pool", None) is None:
+            user.context_pool = ContextPool(
+                user.browser, on_new_context=getattr(user, "setup_context", None)
+            )
+        user.page = await user.context_pool.acquire()
+        user.browser_context = user.context_pool.context
+
+        name = user.__class__.__name__ + "." + func.__name__
+        task_start_time = time.time()
+        start_perf_counter = time.perf_counter()
+        healthy = True
+        try:
+            await func(user, user.page)
+            user.environment.events.request.fire(
+                request_type="TASK",
+                name=name,
+                start_time=task_start_time,
+                response_time=(time.perf_counter() - start_perf_counter) * 1000,
+                response_length=0,
+                context={**user.context()},
+                exception=None,
+            )
+        except RescheduleTask:
+            healthy = False
+        except Exception as e:
+            healthy = False
+            try:
+                e = CatchResponseError(
+                    re.sub("=======*", "", e.message + user.page.url).replace("\n", "")
+                )
+            except Exception:
+                pass  # never mind
+            user.environment.events.request.fire(
+                request_type="TASK",
+                name=name,
+                start_time=task_start_time,
+                response_time=(time.perf_counter() - start_perf_counter) * 1000,
+                response_length=0,
+                context={**user.context()},
+                exception=e,
+            )
+            logger.error("%s\n%s", e, traceback.format_exc())
+        finally:
+            await user.context_pool.release(healthy)
+
+    return pooled_wrapper
@@ -0,0 +1,307 @@
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from locust.runners import MasterRunner, WorkerRunner, STATE_MISSING
+import locust_plugins.users.playwright as pw_plugin
+from common.helpers.plan_linker import PlanLinker
+from common.helpers.playwright import get_plan_id_from_url
+from common.helpers.logs import get_logger
+from config import COORDINATION_TIMEOUT, REGISTRY_MAX_INACTIVE
+
+logger = get_logger(__name__)
+
+
+class UserRecord:
+    """One registered user. Slotted, since soak runs keep many of them."""
+
+    __slots__ = ("user_id", "ordinal", "active")
+
+    def __init__(self, user_id: int, ordinal: int):
+        self.user_id = user_id
+        self.ordinal = ordinal
+        self.active = False
+
+
+class UserRegistry:
+    """Creation order and active users. There is exactly one, on the master
+    (or in the only process, when Locust doesn't run distributed).
+
+    Records are indexed by user id, so looking up an ordinal is O(1). Only the
+    `max_inactive` most recently released records are kept; an evicted user
+    that comes back gets a new ordinal.
+    """
+
+    def __init__(self, max_inactive: int = REGISTRY_MAX_INACTIVE):
+        self.max_inactive = max_inactive
+        self.records: OrderedDict[int, UserRecord] = OrderedDict()
+        self.total = 0
+        self.active = 0
+        self.inactive = 0
+
+    def register(self, user_id: int) -> dict:
+        record = self.records.get(user_id)
+        if record is None:
+            self.total += 1
+            record = self.records[user_id] = UserRecord(user_id, self.total)
+        elif not record.active:
+            self.inactive -= 1
+        if not record.active:
+            record.active = True
+            self.active += 1
+        # Most recently used last, so eviction takes the longest idle record
+        self.records.move_to_end(user_id)
+        return {"ordinal": record.ordinal, **self.counts()}
+
+    def unregister(self, user_id: int):
+        record = self.records.get(user_id)
+        if record is None or not record.active:
+            return
+        record.active = False
+        self.active -= 1
+        self.inactive += 1
+        self.records.move_to_end(user_id)
+        self._evict()
+
+    def _evict(self):
+        while self.inactive > self.max_inactive:
+            for user_id, record in self.records.items():
+                if not record.active:
+                    del self.records[user_id]
+                    self.inactive -= 1
+                    break
+
+    def counts(self) -> dict:
+        return {"active": self.active, "total": self.total}
+
+
+class Coordinator:
+    """Shares setup data, the user registry and plan linking across Locust processes.
+
+    In master/worker mode (including `--processes`) the master owns the
+    registry and broadcasts the setup data, giving every worker its own slice
+    of the account pool. Plan linking is routed through the master to a single
+    owner, the worker with the lowest index, which runs the only PlanLinker.
+    Without a distributed runner everything is handled in-process.
+    """
+
+    def __init__(self, environment):
+        self.environment = environment
+        self.runner = environment.runner
+        self.registry = UserRegistry()
+        self.setup_data = None
+        self.run_id = None  # Shared by every process of a test run
+        self.on_setup_data = None  # Callback, receives the setup data
+        self._pending: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._linker = None
+        self._linker_loop = None  # The loop the linker's driver and session belong to
+        self._linker_lock = None
+
+        if self.is_master:
+            self.runner.register_message("register_user", self._master_register_user)
+            self.runner.register_message("unregister_user", self._master_unregister_user)
+            self.runner.register_message("user_counts", self._master_user_counts)
+            self.runner.register_message("link_request", self._master_link_request)
+            self.runner.register_message("link_result", self._master_link_result)
+        elif self.is_worker:
+            self.runner.register_message("run_id", self._worker_run_id)
+            self.runner.register_message("setup_data", self._worker_setup_data)
+            self.runner.register_message("link_request", self._worker_link_request)
+            self.runner.register_message("reply", self._worker_reply)
+
+    @property
+    def is_master(self) -> bool:
+        return isinstance(self.runner, MasterRunner)
+
+    @property
+    def is_worker(self) -> bool:
+        return isinstance(self.runner, WorkerRunner)
+
+    def reset(self):
+        """Drops per-run state. A new test run gets a new event loop"""
+        self.close_linker()
+
+    def close_linker(self):
+        """Stops the plan linker's Playwright driver and API session, if started.
+
+        Runs on the loop the linker was started on: still running, or already
+        stopped by the Playwright plugin at test_stop.
+        """
+        linker, loop = self._linker, self._linker_loop
+        self._linker = self._linker_loop = self._linker_lock = None
+        if linker is None or loop.is_closed():
+            return
+        try:
+            if loop.is_running():
+                future = asyncio.run_coroutine_threadsafe(linker.close(), loop)
+                future.result(COORDINATION_TIMEOUT)
+            else:
+                loop.run_until_complete(linker.close())
+            logger.info("🔗 Plan linker closed")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not close the plan linker: {e}")
+
+    # Run id
+
+    def start_run(self):
+        """Names the new test run, on the master for every worker.
+
+        The master's test_start runs before it tells the workers to spawn, so
+        they get the id before their own test_start.
+        """
+        self.run_id = time.strftime("%Y%m%d-%H%M%S")
+        if self.is_master:
+            self.runner.send_message("run_id", {"run_id": self.run_id})
+
+    def _worker_run_id(self, environment, msg, **kwargs):
+        self.run_id = msg.data["run_id"]
+
+    # Setup data
+
+    def publish_setup_data(self, data: dict, accounts: list[dict]):
+        """Applies the setup data locally, or sends it to every worker"""
+        if not self.is_master:
+            self._apply_setup_data({**data, "accounts": accounts, "worker_share": 1})
+            return
+
+        workers = sorted(
+            (c.id for c in self.runner.clients.values() if c.state != STATE_MISSING),
+            key=self.runner.get_worker_index,
+        )
+        self.setup_data = data
+        for i, client_id in enumerate(workers):
+            # Each worker gets its own accounts, so no account is used twice
+            slice_ = accounts[i :: len(workers)]
+            self.runner.send_message(
+                "setup_data",
+                {**data, "accounts": slice_, "worker_share": 1 / len(workers)},
+                client_id=client_id,
+            )
+        logger.info(f"📡 Setup data sent to {len(workers)} workers")
+
+    def _apply_setup_data(self, data: dict):
+        self.setup_data = data
+        if self.on_setup_data:
+            self.on_setup_data(data)
+
+    def _worker_setup_data(self, environment, msg, **kwargs):
+        self._apply_setup_data(msg.data)
+
+    # Requests from Locust users (run on the Playwright event loop)
+
+    async def _request(self, msg_type: str, data: dict):
+        """Sends a message to the master and waits for its reply"""
+        loop = asyncio.get_running_loop()
+        request_id = uuid.uuid4().hex
+        future = loop.create_future()
+        self._pending[request_id] = (loop, future)
+        self.runner.send_message(msg_type, {**data, "request_id": request_id})
+        try:
+            reply = await asyncio.wait_for(future, COORDINATION_TIMEOUT)
+        finally:
+            self._pending.pop(request_id, None)
+        if reply.get("error"):
+            raise RuntimeError(reply["error"])
+        return reply.get("result")
+
+    def _worker_reply(self, environment, msg, **kwargs):
+        pending = self._pending.get(msg.data["request_id"])
+        if pending:
+            loop, future = pending
+            loop.call_soon_threadsafe(
+                lambda: future.done() or future.set_result(msg.data)
+            )
+
+    async def register_user(self, user_id: int) -> dict:
+        """Registers an active user, returns its creation ordinal and the counts"""
+        if self.is_worker:
+            return await self._request("register_user", {"user_id": user_id})
+        return self.registry.register(user_id)
+
+    def unregister_user(self, user_id: int):
+        if self.is_worker:
+            self.runner.send_message("unregister_user", {"user_id": user_id})
+        else:
+            self.registry.unregister(user_id)
+
+    async def user_counts(self) -> dict:
+        """Active and total users across all processes"""
+        if self.is_worker:
+            return await self._request("user_counts", {})
+        return self.registry.counts()
+
+    async def link_user(self, user_id: int, plan_id: int = None):
+        """Links a user to a plan (the shared plan by default) through the single linking owner"""
+        if self.is_worker:
+            return await self._request("link_request", {"user_id": user_id, "plan_id": plan_id})
+        return await self._link_locally(user_id, plan_id)
+
+    async def _link_locally(self, user_id: int, plan_id: int = None):
+        if self._linker_lock is None:
+            self._linker_lock = asyncio.Lock()
+        async with self._linker_lock:
+            if self._linker is None:
+                logger.info("🆕 Starting the plan linking service...")
+                self._linker_loop = asyncio.get_running_loop()
+                self._linker = await PlanLinker.start(
+                    self.setup_data["auth_cookies"],
+                    get_plan_id_from_url(self.setup_data["shared_plan_url"]),
+                )
+        return await self._linker.link(user_id, plan_id)
+
+    # Master side
+
+    def _reply(self, client_id: str, request_id: str, result=None, error=None):
+        self.runner.send_message(
+            "reply",
+            {"request_id": request_id, "result": result, "error": error},
+            client_id=client_id,
+        )
+
+    def _master_register_user(self, environment, msg, **kwargs):
+        result = self.registry.register(msg.data["user_id"])
+        self._reply(msg.node_id, msg.data["request_id"], result)
+
+    def _master_unregister_user(self, environment, msg, **kwargs):
+        self.registry.unregister(msg.data["user_id"])
+
+    def _master_user_counts(self, environment, msg, **kwargs):
+        self._reply(msg.node_id, msg.data["request_id"], self.registry.counts())
+
+    def _linking_owner(self):
+        workers = [
+            c.id for c in self.runner.clients.values() if c.state != STATE_MISSING
+        ]
+        return min(workers, key=self.runner.get_worker_index) if workers else None
+
+    def _master_link_request(self, environment, msg, **kwargs):
+        owner = self._linking_owner()
+        if owner is None:
+            self._reply(msg.node_id, msg.data["request_id"], error="No linking owner")
+            return
+        self.runner.send_message(
+            "link_request", {**msg.data, "origin": msg.node_id}, client_id=owner
+        )
+
+    def _master_link_result(self, environment, msg, **kwargs):
+        self._reply(
+            msg.data["origin"],
+            msg.data["request_id"],
+            msg.data.get("result"),
+            msg.data.get("error"),
+        )
+
+    # Linking owner (worker side)
+
+    def _worker_link_request(self, environment, msg, **kwargs):
+        async def link():
+            reply = {"request_id": msg.data["request_id"], "origin": msg.data["origin"]}
+            try:
+                reply["result"] = await self._link_locally(
+                    msg.data["user_id"], msg.data.get("plan_id")
+                )
+            except Exception as e:
+                reply["error"] = f"{e.__class__.__name__}: {e}"
+            self.runner.send_message("link_result", reply)
+
+        asyncio.run_coroutine_threadsafe(link(), pw_plugin.loop)
@@ -2,6 +2,10 @@ from playwright.async_api import Page
 
 
 # Define global selectors as functions or variables
+USER_AVATAR_SELECTOR = '[data-testid="btn-user-avatar"]'
+SPINNER_SELECTOR = '[data-testid*="spinner"]'
+
+
 def get_user_avatar(page: Page):
     """Circle icon that represents the user in top right header"""
     return page.get_by_test_id("btn-user-avatar")
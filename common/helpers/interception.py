@@ -0,0 +1,123 @@
+import re
+from collections import Counter
+from playwright.async_api import Playwright, Browser, BrowserContext, Route
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+# What each profile blocks. Stylesheets and scripts are never blocked: the
+# readiness check and the editors depend on layout and the app itself.
+INTERCEPTION_PROFILES = {
+    "full": {
+        "resource_types": set(),
+        "url_patterns": [],
+    },
+    "no-media": {
+        "resource_types": {"image", "media", "font"},
+        "url_patterns": [],
+    },
+    "api-only-assets": {
+        "resource_types": {"image", "media", "font", "manifest", "texttrack"},
+        "url_patterns": [
+            r"google-analytics\.com|googletagmanager\.com|segment\.(io|com)",
+            r"sentry\.io|datadoghq|hotjar|fullstory|intercom",
+            r"/tiles?/|tile\.openstreetmap|api\.mapbox\.com|arcgisonline",
+        ],
+    },
+}
+
+# Chromium flags for packing many headless browsers onto one load generator.
+# On top of the ones locust-plugins uses, these switch off background work a
+# load-test browser never needs.
+CHROMIUM_DENSITY_ARGS = [
+    "--disable-gpu",
+    "--disable-setuid-sandbox",
+    "--disable-accelerated-2d-canvas",
+    "--no-zygote",
+    "--frame-throttle-fps=10",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-translate",
+    "--safebrowsing-disable-auto-update",
+    "--disable-sync",
+    "--hide-scrollbars",
+    "--disable-notifications",
+    "--disable-logging",
+    "--ignore-certificate-errors",
+    "--no-first-run",
+    "--disable-audio-output",
+    "--mute-audio",
+    "--disable-canvas-aa",
+    "--disable-extensions",
+    "--disable-default-apps",
+    "--disable-component-update",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-dev-shm-usage",
+    "--metrics-recording-only",
+]
+if CONTEXT_MAX_HEAP_MB:
+    # A hard cap well above the pool's recycle threshold, so a context is
+    # recycled gracefully long before V8 runs out of heap and crashes the tab
+    CHROMIUM_DENSITY_ARGS.append(f"--js-flags=--max-old-space-size={CONTEXT_MAX_HEAP_MB * 2}")
+
+# Blocked and allowed request counts, per profile
+interception_stats: dict[str, Counter] = {}
+
+
+def get_interception_profile(name: str) -> dict:
+    if name not in INTERCEPTION_PROFILES:
+        raise ValueError(
+            f"Unknown interception profile: {name} "
+            f"(expected one of {', '.join(INTERCEPTION_PROFILES)})"
+        )
+    return INTERCEPTION_PROFILES[name]
+
+
+async def apply_interception_profile(
+    context: BrowserContext, name: str = INTERCEPTION_PROFILE
+):
+    """Blocks the profile's non-essential requests for every page of the context"""
+    profile = get_interception_profile(name)
+    stats = interception_stats.setdefault(name, Counter())
+
+    if not profile["resource_types"] and not profile["url_patterns"]:
+        # Routing every request costs a round trip, so `full` only counts
+        context.on("request", lambda request: stats.update(["allowed"]))
+        return
+
+    url_pattern = re.compile("|".join(profile["url_patterns"]) or r"(?!)")
+
+    async def handle(route: Route):
+        request = route.request
+        if request.resource_type in profile["resource_types"] or url_pattern.search(
+            request.url
+        ):
+            stats.update(["blocked", f"blocked:{request.resource_type}"])
+            await route.abort("blockedbyclient")
+        else:
+            stats.update(["allowed"])
+            await route.fallback()
+
+    await context.route("**/*", handle)
+
+
+def interception_summary() -> list[str]:
+    """One line per profile with its blocked/allowed counts"""
+    lines = []
+    for name, stats in interception_stats.items():
+        total = stats["blocked"] + stats["allowed"]
+        share = stats["blocked"] / total if total else 0
+        lines.append(
+            f"🚧 Interception profile '{name}': {stats['blocked']} blocked, "
+            f"{stats['allowed']} allowed ({share:.0%} blocked)"
+        )
+    return lines
+
+
+async def launch_density_browser(playwright: Playwright, headless: bool) -> Browser:
+    """Launches Chromium with the flags tuned for headless density"""
+    logger.debug("About to start a density-tuned chromium browser")
+    return await playwright.chromium.launch(headless=headless, args=CHROMIUM_DENSITY_ARGS)
@@ -0,0 +1,163 @@
+import re
+import sys
+import atexit
+import random
+import logging
+import logging.handlers
+from collections import deque
+from gevent import monkey
+from config import *
+
+# Every logger of the load test lives under this one, so Locust's own logging
+# (and its synchronous console handler) is left alone.
+ROOT_LOGGER = "onebrief"
+FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Real OS threads and sleeps, even after gevent's monkey patching: the writer
+# must not run on the hub that drives the browsers.
+_start_new_thread = monkey.get_original("_thread", "start_new_thread")
+_RLock = monkey.get_original("_thread", "RLock")
+_sleep = monkey.get_original("time", "sleep")
+
+# Quoted values end at the first unescaped quote, so an escaped quote inside a
+# secret doesn't end the match early and leak the rest of it.
+_REDACTIONS = [
+    # 'password': '...' / "password": "..." in logged dicts and JSON
+    (re.compile(r"""(['"](?:password|confirm-password|token)['"]\s*:\s*)(['"])(?:\\.|(?!\2).)*\2"""), r"\1\2***\2"),
+    # Cookie values: {'name': ..., 'value': '...'}
+    (re.compile(r"""(['"]value['"]\s*:\s*)(['"])(?:\\.|(?!\2).)*\2"""), r"\1\2***\2"),
+    # password=... in URLs and form bodies
+    (re.compile(r"(password=)[^&\s]+"), r"\1***"),
+]
+
+
+def get_logger(name: str) -> logging.Logger:
+    """The logger of a category, e.g. "user" or a module's __name__"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def redact(text: str) -> str:
+    """Masks passwords and cookie values"""
+    for pattern, replacement in _REDACTIONS:
+        text = pattern.sub(replacement, text)
+    if SUPERVISOR_PASSWORD:
+        text = text.replace(SUPERVISOR_PASSWORD, "***")
+    return text
+
+
+def category_setting(settings: dict, record: logging.LogRecord, default):
+    """The setting of the record's category or of its nearest parent category"""
+    name = record.name[len(ROOT_LOGGER) + 1 :]
+    while name:
+        if name in settings:
+            return settings[name]
+        name = name.rpartition(".")[0]
+    return default
+
+
+class SamplingFilter(logging.Filter):
+    """Lets through a fraction of the records of each category below WARNING"""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = 0
+
+    def filter(self, record):
+        rate = category_setting(self.rates, record, 1.0)
+        if record.levelno >= logging.WARNING or rate >= 1 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """Formats and redacts on the caller, writes from a background OS thread.
+
+    The queue is bounded: when the writer falls behind, new lines are dropped
+    and counted instead of blocking the event loop.
+    """
+
+    def __init__(self, handlers: list, max_lines: int = LOG_QUEUE_SIZE):
+        super().__init__(deque())
+        self.handlers = handlers
+        for handler in handlers:
+            # Only the writer thread uses these; a gevent lock would block it
+            handler.lock = _RLock()
+        self.max_lines = max_lines
+        self.dropped = 0
+        _start_new_thread(self._write_forever, ())
+
+    def prepare(self, record):
+        record = super().prepare(record)
+        record.msg = redact(record.msg)
+        return record
+
+    def enqueue(self, record):
+        if len(self.queue) >= self.max_lines:
+            self.dropped += 1
+            return
+        self.queue.append(record)
+
+    def drain(self):
+        """Writes every queued line"""
+        while self.queue:
+            try:
+                record = self.queue.popleft()
+            except IndexError:
+                break  # Drained by the other thread at exit
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        for handler in self.handlers:
+            handler.flush()
+
+    def _write_forever(self):
+        while True:
+            if not self.queue:
+                _sleep(0.05)
+                continue
+            self.drain()
+
+
+_handler = None
+_sampler = None
+
+
+def setup_logging(filename: str):
+    """Sends the load test's logging to `filename` (and the console) through the queue.
+
+    Only the first call configures anything, so modules that are also run on
+    their own (setup.py) can call it unconditionally.
+    """
+    global _handler, _sampler
+    if _handler is not None:
+        return
+
+    file_handler = logging.FileHandler(filename)
+    file_handler.setFormatter(logging.Formatter(FORMAT))
+    handlers = [file_handler]
+    if LOG_CONSOLE:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter("%(message)s"))
+        handlers.append(console)
+
+    _sampler = SamplingFilter(LOG_SAMPLE_RATES)
+    _handler = BackgroundQueueHandler(handlers)
+    _handler.addFilter(_sampler)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+    root.addHandler(_handler)
+    atexit.register(_handler.drain)  # The writer thread dies with the process
+    for name, level in LOG_LEVELS.items():
+        get_logger(name).setLevel(level)
+
+
+def log_stats() -> dict:
+    return {
+        "queued": len(_handler.queue) if _handler else 0,
+        "dropped": _handler.dropped if _handler else 0,
+        "sampled_out": _sampler.sampled_out if _sampler else 0,
+    }
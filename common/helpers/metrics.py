@@ -0,0 +1,121 @@
+import time
+import functools
+import contextvars
+from contextlib import asynccontextmanager
+from common.helpers.logs import get_logger
+
+logger = get_logger(__name__)
+
+# Names of the actions currently running, outermost first. A ContextVar, so
+# concurrent users (asyncio tasks) each see their own stack.
+_action_path = contextvars.ContextVar("action_path", default=())
+
+# The Locust user whose task is running, so metrics fired by the helpers
+# carry that user's context (ordinal, shard) like its own request events.
+_current_user = contextvars.ContextVar("current_user", default=None)
+
+# Set by the locustfile on init. Helpers also run from setup.py, where there is
+# no Locust environment, so firing a metric without one is a no-op.
+environment = None
+
+
+# Receivers of gauges: rates and counts that are not latencies, so they stay out
+# of Locust's request stats. Each is called with (name, value, unit, context).
+gauge_listeners = []
+
+
+def set_environment(env):
+    global environment
+    environment = env
+
+
+def set_current_user(user):
+    """Marks the user whose task is running in this asyncio task"""
+    _current_user.set(user)
+
+
+def fire_metric(
+    request_type: str,
+    name: str,
+    response_time: float,
+    response_length: int = 0,
+    exception: Exception = None,
+    context: dict = None,
+):
+    """Reports a custom measurement to Locust as a request event.
+
+    Only for durations: counts and rates such as queue depth would skew the
+    request stats and percentiles, so they go through `record_gauge`.
+    """
+    if environment is None:
+        return
+    user = _current_user.get()
+    if context is None and user is not None:
+        context = user.context()
+    try:
+        environment.events.request.fire(
+            request_type=request_type,
+            name=name,
+            start_time=time.time(),
+            response_time=response_time,
+            response_length=response_length,
+            context=context or {},
+            exception=exception,
+        )
+    except Exception as e:
+        logger.error(f"❌ Failed to report metric {request_type} {name}: {e}")
+
+
+def record_gauge(name: str, value: float, unit: str = "", context: dict = None):
+    """Reports a gauge (e.g. frames per second) to the gauge listeners"""
+    user = _current_user.get()
+    if context is None and user is not None:
+        context = user.context()
+    for listener in gauge_listeners:
+        try:
+            listener(name, value, unit, context or {})
+        except Exception as e:
+            logger.error(f"❌ Failed to record gauge {name}: {e}")
+
+
+def action_name(name: str = None) -> str:
+    """The hierarchical name of the running action, e.g. 'edit order > edit_order'"""
+    path = _action_path.get() + ((name,) if name else ())
+    return " > ".join(path)
+
+
+@asynccontextmanager
+async def action(name: str, request_type: str = "ACTION"):
+    """Times the block as a Locust event named after the enclosing actions.
+
+    Unlike locust_plugins' `event`, exceptions are reported and re-raised, so
+    the helpers keep their error handling.
+    """
+    token = _action_path.set(_action_path.get() + (name,))
+    full_name = action_name()
+    start = time.perf_counter()
+    exception = None
+    try:
+        yield
+    except Exception as e:
+        exception = e
+        raise
+    finally:
+        _action_path.reset(token)
+        fire_metric(
+            request_type,
+            full_name,
+            (time.perf_counter() - start) * 1000,
+            exception=exception,
+        )
+
+
+def timed(func):
+    """Reports every call of the decorated coroutine function as an action"""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with action(func.__name__):
+            return await func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,136 @@
+import re
+import weakref
+import functools
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+import gevent
+from playwright.async_api import BrowserContext, Request, Response, Error
+from common.helpers.metrics import fire_metric
+from config import *
+
+# Path segments that identify a record rather than a route: numbers, UUIDs,
+# long hex strings (hashes) and long opaque tokens.
+_ID_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    r"|[0-9a-f]{16,}|[A-Za-z0-9_-]{32,})$",
+    re.IGNORECASE,
+)
+_OWN_HOST = urlsplit(HOST_URL).netloc
+
+
+class NetworkError(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=4096)
+def template_url(url: str) -> str:
+    """'https://host/api/brief/123/access/user/45/editor?x=1' -> '/api/brief/{id}/access/user/{id}/editor'
+
+    Other hosts keep their host name, so third-party calls stay recognizable.
+    """
+    parts = urlsplit(url)
+    path = "/".join(
+        "{id}" if _ID_SEGMENT.match(segment) else segment for segment in parts.path.split("/")
+    )
+    return path if parts.netloc == _OWN_HOST else f"{parts.netloc}{path}"
+
+
+class NetworkTelemetry:
+    """Request counts, status classes, bytes and timings per templated URL.
+
+    Listens on browser contexts with callbacks that only append to a list;
+    the samples reach Locust as `NET` request events when they are flushed,
+    every NETWORK_FLUSH_INTERVAL seconds. Timings come from Playwright's
+    resource timing (`request.timing`), so they are the browser's numbers, not
+    when Python happened to see the event. Bytes come from the content-length
+    header, or for responses without one (chunked, compressed) from
+    `request.sizes()`, which costs a round trip to the driver.
+    """
+
+    def __init__(
+        self,
+        resource_types: tuple = NETWORK_RESOURCE_TYPES,
+        max_templates: int = NETWORK_MAX_TEMPLATES,
+        flush_interval: float = NETWORK_FLUSH_INTERVAL,
+    ):
+        self.resource_types = set(resource_types)
+        self.max_templates = max_templates
+        self.flush_interval = flush_interval
+        self.status_classes = Counter()
+        self._samples = defaultdict(list)  # (method, template) -> [(ms, bytes, error)]
+        self._responses = weakref.WeakKeyDictionary()  # request -> (status, bytes or None)
+        self._greenlet = None
+
+    def attach(self, context: BrowserContext):
+        """Collects the requests of every page in the context"""
+        context.on("response", self._on_response)
+        context.on("requestfinished", self._on_finished)
+        context.on("requestfailed", self._on_failed)
+
+    def _on_response(self, response: Response):
+        request = response.request
+        if request.resource_type in self.resource_types:
+            size = response.headers.get("content-length")
+            self._responses[request] = (response.status, int(size) if size else None)
+
+    async def _on_finished(self, request: Request):
+        if request.resource_type not in self.resource_types:
+            return
+        status, size = self._responses.pop(request, (0, None))
+        if size is None:
+            try:
+                size = (await request.sizes())["responseBodySize"]
+            except Error:
+                size = 0  # The page or context closed in the meantime
+        self.status_classes[f"{status // 100}xx" if status else "no response"] += 1
+        error = f"HTTP {status // 100}xx" if status >= 400 else None
+        self._record(request, size, error)
+
+    def _on_failed(self, request: Request):
+        if request.resource_type not in self.resource_types:
+            return
+        failure = request.failure or "failed"
+        if "BLOCKED_BY_CLIENT" in failure:
+            return  # Blocked on purpose by the interception profile
+        self.status_classes["failed"] += 1
+        self._record(request, 0, failure)
+
+    def _record(self, request: Request, size: int, error: str):
+        timing = request.timing
+        elapsed = max(timing.get("responseEnd", -1), 0)
+        key = (request.method, template_url(request.url))
+        if key not in self._samples and len(self._samples) >= self.max_templates:
+            key = (request.method, "{other}")
+        self._samples[key].append((elapsed, size, error))
+
+    def flush(self):
+        """Reports the samples collected since the last flush"""
+        samples, self._samples = self._samples, defaultdict(list)
+        for (method, template), rows in samples.items():
+            name = f"{method} {template}"
+            for elapsed, size, error in rows:
+                fire_metric(
+                    "NET", name, elapsed, size, exception=NetworkError(error) if error else None
+                )
+
+    def _flush_forever(self):
+        while True:
+            gevent.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self):
+        if self._greenlet is None:
+            self._greenlet = gevent.spawn(self._flush_forever)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill()
+            self._greenlet = None
+        self.flush()
+
+    def summary(self) -> str:
+        classes = ", ".join(f"{k}: {v}" for k, v in sorted(self.status_classes.items()))
+        return f"🌐 Network: {classes or 'no requests'}"
+
+
+network_telemetry = NetworkTelemetry()
@@ -0,0 +1,133 @@
+import time
+import asyncio
+from playwright.async_api import async_playwright, Playwright, APIRequestContext
+from common.helpers.metrics import fire_metric, record_gauge, set_current_user
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+
+class PlanLinkError(Exception):
+    pass
+
+
+class PlanLinker:
+    """Links users to a plan through the API, without a supervisor page.
+
+    A single APIRequestContext holds the supervisor storage state, so every
+    request carries the supervisor cookies without rebuilding a header. Link
+    requests go through a queue: duplicates for a user that is already queued
+    share one request, and a fixed number of workers keep requests pipelined
+    with bounded concurrency and retries.
+    """
+
+    def __init__(
+        self,
+        request_context: APIRequestContext,
+        plan_id: int,
+        concurrency: int = LINK_CONCURRENCY,
+        retries: int = LINK_RETRIES,
+        backoff: float = LINK_RETRY_BACKOFF,
+        playwright: Playwright = None,
+    ):
+        self.request_context = request_context
+        self.plan_id = plan_id
+        self.retries = retries
+        self.backoff = backoff
+        self._playwright = playwright
+        self._queue = asyncio.Queue()
+        self._pending: dict[int, asyncio.Future] = {}
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(concurrency)
+        ]
+
+    @classmethod
+    async def start(cls, supervisor_cookies: list[dict], plan_id: int, **kwargs):
+        """Starts a linker with its own Playwright driver and API session"""
+        playwright = await async_playwright().start()
+        request_context = await playwright.request.new_context(
+            base_url=HOST_URL,
+            storage_state={"cookies": supervisor_cookies, "origins": []},
+            extra_http_headers={"Accept": "application/json, text/plain, */*"},
+        )
+        logger.info(f"🔗 Plan linker started for plan {plan_id}")
+        return cls(request_context, plan_id, playwright=playwright, **kwargs)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def link(self, user_id: int, plan_id: int = None):
+        """Queues a link request and waits until the user is linked.
+
+        `plan_id` defaults to the linker's plan; sharded runs link to others.
+        """
+        key = (user_id, plan_id or self.plan_id)
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            self._queue.put_nowait((key, time.perf_counter()))
+            record_gauge("LINK queue depth", self.queue_depth(), "requests")
+        # Shielded so a cancelled caller doesn't cancel a request others wait on
+        return await asyncio.shield(future)
+
+    async def _worker(self):
+        set_current_user(None)  # Started from some user's task, but serves them all
+        while True:
+            key, queued_at = await self._queue.get()
+            future = self._pending.pop(key)
+            user_id, plan_id = key
+            try:
+                await self._link_with_retries(user_id, plan_id)
+                if not future.done():
+                    future.set_result(user_id)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                fire_metric(
+                    "LINK",
+                    "link end-to-end (queued)",
+                    (time.perf_counter() - queued_at) * 1000,
+                    exception=future.exception() if future.done() else None,
+                )
+                self._queue.task_done()
+
+    async def _link_with_retries(self, user_id: int, plan_id: int):
+        api_url = f"/api/brief/{plan_id}/access/user/{user_id}/editor"
+        delay = self.backoff
+        for attempt in range(1, self.retries + 1):
+            start = time.perf_counter()
+            error = None
+            try:
+                response = await self.request_context.put(
+                    api_url, headers={"Content-Length": "0"}
+                )
+                if not response.ok:
+                    error = PlanLinkError(f"HTTP {response.status} linking {user_id}")
+            except Exception as e:
+                error = PlanLinkError(f"{e.__class__.__name__} linking {user_id}: {e}")
+
+            fire_metric(
+                "LINK",
+                "link_user_to_plan_api",
+                (time.perf_counter() - start) * 1000,
+                exception=error,
+            )
+            if error is None:
+                logger.info(f"✅ Linked {user_id} to plan {plan_id}")
+                return
+            logger.warning(f"⚠️ Attempt {attempt}/{self.retries}: {error}")
+            if attempt < self.retries:
+                await asyncio.sleep(delay)
+                delay *= 2
+        raise error
+
+    async def close(self):
+        """Stops the workers and disposes of the API session and driver"""
+        for worker in self._workers:
+            worker.cancel()
+        await self.request_context.dispose()
+        if self._playwright:
+            await self._playwright.stop()
@@ -1,22 +1,21 @@
 import random
+import secrets
 from playwright.async_api import Page, expect
 import re
 from common.helpers.global_selectors import *
+from common.helpers.readiness import wait_until_ready
+from common.helpers.profile_cache import profile_cache
+from common.helpers.collab import make_collab_token
+from common.helpers.text_input import random_sentence, type_text, pause
+from common.helpers.metrics import timed
+from common.helpers.plan_linker import PlanLinkError
+from common.helpers.logs import get_logger
 from config import SUPERVISOR_USERNAME, SUPERVISOR_PASSWORD
 import time
-import logging
-from faker import Faker
 import asyncio
 from config import *
 
-fake = Faker()
-
-# Configure logging to append to the Locust log file
-logging.basicConfig(
-    filename="load_test.log",  # Locust log file
-    level=logging.INFO,  # you can change this to DEBUG, ERROR, etc.
-    format="%(asctime)s - %(levelname)s - %(message)s",  # Log format
-)
+logger = get_logger(__name__)
 
 
 async def resize_browser(page: Page):
@@ -28,9 +27,9 @@ async def login_supervisor(page: Page):
     if logged_in:
         return
 
-    logging.info("🇺🇸 Logging in the supervisor...")
+    logger.info("🇺🇸 Logging in the supervisor...")
     await login(page, SUPERVISOR_USERNAME, SUPERVISOR_PASSWORD)
-    logging.info("🇺🇸 Supervisor logged in...")
+    logger.info("🇺🇸 Supervisor logged in...")
 
 
 def get_ts_string():
@@ -39,8 +38,8 @@ def get_ts_string():
 
 def get_performance_user_credentials():
     """Returns unique performance user credentials"""
-    # Generate a unique standard-length number string from time.time()
-    slug = get_ts_string()
+    # Timestamp plus a random suffix, so accounts registered concurrently don't collide
+    slug = f"{get_ts_string()}{secrets.token_hex(2)}"
     name = "Performance User"
     return {
         "email": f"perf-user-{slug}@onebrief.com",
@@ -61,14 +60,14 @@ async def register_user(page: Page, screenshot: bool = False):
 
     uname = creds["username"]
 
-    logging.info(
+    logger.info(
         f"🍔 Registering user with username: {creds['username']} and email {creds['email']}..."
     )
 
     # Navigate to login form
     await page.goto(f"{HOST_URL}/login")
     await page.get_by_test_id("sign-up").click()
-    logging.info(f"🍔 {uname} is on registration page...")
+    logger.info(f"🍔 {uname} is on registration page...")
 
     # Iterate over the credentials, which is a dictionary
     for field, value in creds.items():  # Use items() to get both key and value
@@ -83,7 +82,7 @@ async def register_user(page: Page, screenshot: bool = False):
     # Check the accept terms box
     await page.get_by_test_id("terms").check()
 
-    logging.info(f"🍔 {uname} is about to check the terms...")
+    logger.info(f"🍔 {uname} is about to check the terms...")
 
     # Ensure that the register button is enabled
     register_btn = page.get_by_test_id("submit-registration")
@@ -94,12 +93,13 @@ async def register_user(page: Page, screenshot: bool = False):
     await expect(page).not_to_have_url(
         re.compile(r".*/login"), timeout=NAVIGATION_TIMEOUT
     )
+    profile_cache.invalidate(page.context)
 
-    logging.info(f"🍔 {uname} is waiting for page to fully load...")
+    logger.info(f"🍔 {uname} is waiting for page to fully load...")
     await wait_for_page_to_fully_load(page)
-    logging.info(f"🍔 {uname} has a fully loaded page...")
+    logger.info(f"🍔 {uname} has a fully loaded page...")
 
-    logging.info(f"🍔 {uname} is navigating to the home page...")
+    logger.info(f"🍔 {uname} is navigating to the home page...")
 
     # Get the user data and add it to creds
     user_data = await get_user_data(page)
@@ -107,7 +107,7 @@ async def register_user(page: Page, screenshot: bool = False):
         creds["user_data"] = user_data
 
     # Return the user data
-    logging.info(f"🍔 Returning creds...")
+    logger.info(f"🍔 Returning creds...")
     return creds
 
 
@@ -117,6 +117,7 @@ async def login(page: Page, username: str, password: str):
     await page.fill("input[name='username']", username)
     await page.fill("input[name='password']", password)
     await page.click("button[type='submit']")
+    profile_cache.invalidate(page.context)
 
     # Insert expect here that waits for the locator
     await expect(get_user_avatar(page)).to_be_visible(timeout=10000)
@@ -125,57 +126,26 @@ async def login(page: Page, username: str, password: str):
     await wait_for_page_to_fully_load(page)
 
 
-async def poll_expect(fn, timeout=5000, interval=500):
-    """Polls a given function until it returns True or timeout is reached."""
-    start_time = asyncio.get_event_loop().time()
-
-    while (asyncio.get_event_loop().time() - start_time) * 1000 < timeout:
-        if await fn():
-            return True
-        await asyncio.sleep(interval / 1000)
-
-    raise TimeoutError(f"Condition not met within {timeout}ms")
-
-
-async def no_spinners_visible(page: Page) -> bool:
-    """Checks if there are no spinners visible"""
-    spinners = await page.locator('[data-testid*="spinner"]:visible').count()
-    return spinners == 0
-
-
-async def page_load_state_complete(page: Page) -> bool:
-    complete = await page.evaluate("document.readyState") == "complete"
-    return complete
-
-
-async def user_avatar_visible(page: Page) -> bool:
-    """Checks if the user avatar is visible"""
-    return await get_user_avatar(page).is_visible()
-
-
-async def wait_for_page_to_fully_load(page: Page):
-    """Waits for the page to fully load"""
+async def wait_for_page_to_fully_load(page: Page, timeout: int = READINESS_TIMEOUT):
+    """Waits for the page to fully load and returns the time-to-ready in ms"""
     # Barebones... not even domcontentloaded (which doesn't always fire)
-    long_timeout = 60000
+    return await wait_until_ready(page, timeout=timeout)
 
-    try:
-        await poll_expect(lambda: no_spinners_visible(page), timeout=long_timeout)
-        await poll_expect(lambda: page_load_state_complete(page), timeout=long_timeout)
-        await poll_expect(lambda: user_avatar_visible(page), timeout=long_timeout)
-
-    except Exception as e:
-        logging.error(f"Error waiting for page to load: {e}")
-        raise  # 🔥 Do not silently return False
 
+async def get_user_data(page: Page, attempts: int = 0, use_cache: bool = True):
+    """Returns the logged in user's profile, or None"""
+    if use_cache:
+        cached = profile_cache.get(page.context)
+        if cached:
+            return cached
 
-async def get_user_data(page: Page, attempts: int = 0):
-    """Checks if the user is logged in"""
     # Create an api call to /api/auth/profile
     try:
         response = await page.request.get(f"{HOST_URL}/api/auth/profile")
         data = await response.json()
         # If data is an object containing "id" return it
         if isinstance(data, dict) and "id" in data:
+            profile_cache.set(page.context, data)
             return data
         else:
             return None
@@ -185,7 +155,8 @@ async def get_user_data(page: Page, attempts: int = 0):
 
 async def is_logged_in(page: Page):
     """Checks if the user is logged in"""
-    user_data = await get_user_data(page)
+    # Always ask the server, a cached profile can outlive the session
+    user_data = await get_user_data(page, use_cache=False)
     if user_data:
         return True
     else:
@@ -227,16 +198,17 @@ async def create_special_order(page: Page) -> str:
 
 
 def get_random_text():
-    # Use faker to generate random text
-    return fake.sentence()
+    # A sentence from the pre-generated corpus
+    return random_sentence()
 
 
 def rand_between(min, max):
     return random.randint(min, max)
 
 
-async def edit_order(page: Page, screenshot: bool = False):
-    """Edits current order"""
+@timed
+async def edit_order(page: Page, screenshot: bool = False, typing: str = None):
+    """Edits current order, typing in the given mode (TYPING_MODE by default)"""
     order_editor = page.get_by_test_id("order-editor")
     await expect(order_editor).to_be_visible(timeout=10000)
     # Get the total count of the paragraphs
@@ -251,20 +223,22 @@ async def edit_order(page: Page, screenshot: bool = False):
     id = u.get("id", "?")
     random_text = f"{username} [id={id}] — {get_random_text()}"
     ts = get_ts_string()
-    logging.info(f"😜 {ts} => {random_text}")
-    # Get a random number between 5 and 50
-    delay = float(random.randint(25, 75))
-    await pm.press_sequentially(random_text, delay=delay)
-    await page.wait_for_timeout(1000)
+    logger.info(f"😜 {ts} => {random_text}")
+    await type_text(page, pm, random_text, typing)
+    if COLLAB_LATENCY:
+        # One input event, so observers see the whole token at once
+        await page.keyboard.insert_text(f" {make_collab_token(id)}")
+    await pause(1000, mode=typing)
     await page.keyboard.press("Enter")
     # Wait for a random amount
-    await page.wait_for_timeout(rand_between(1000, 4000))
+    await pause(1000, 4000, mode=typing)
     await page.keyboard.press("Escape")
-    await page.wait_for_timeout(1000)
+    await pause(1000, mode=typing)
     if screenshot:
         await page.screenshot(path=f"order-{ts}.png")
 
 
+@timed
 async def create_artifact(page: Page, artifact_type: str, artifact_title: str = None):
     if artifact_type not in get_allowable_artifacts():
         raise ValueError(f"Invalid artifact type: {artifact_type}")
@@ -281,12 +255,12 @@ async def create_artifact(page: Page, artifact_type: str, artifact_title: str =
     # Default name?
     if not artifact_title:
         ts = get_ts_string()
-        page_title = f"{artifact_type} - [user {user["id"]}] - {time.time()}"
+        page_title = f"{artifact_type} - [user {user['id']}] - {time.time()}"
     else:
         page_title = artifact_title
 
     # Now title the page
-    await title_page(page, artifact_title)
+    await title_page(page, page_title)
     # Assume that the title is now set
     return page.url
 
@@ -299,11 +273,16 @@ async def create_random_artifact(page: Page):
     return url
 
 
+@timed
 async def link_user_to_plan_api(page: Page, user_id: int, plan_id: int):
-    """Dispatches a PUT request to link a user to the shared plan via API."""
+    """Dispatches a PUT request to link a user to the shared plan via API.
+
+    Raises PlanLinkError when the request fails or is refused, so callers
+    never record a link that didn't happen.
+    """
 
     api_url = f"{HOST_URL}/api/brief/{plan_id}/access/user/{user_id}/editor"
-    logging.info(f"🐝 Making PUT request to {api_url}")
+    logger.info(f"🐝 Making PUT request to {api_url}")
 
     try:
         # Get cookies and format them as a header string
@@ -317,31 +296,15 @@ async def link_user_to_plan_api(page: Page, user_id: int, plan_id: int):
         }
 
         response = await page.request.put(api_url, headers=headers)
-
-        logging.info(f"📡 Response Status: {response.status}")
-        logging.info(f"📡 Response Headers: {response.headers}")
-
-        # ✅ Handle empty response
-        response_text = await response.text()
-        if not response_text.strip():
-            logging.info(
-                f"✅ Successfully linked {user_id} to plan {plan_id}. (No response body)"
-            )
-            return None  # Nothing to parse, exit function
-
-        # ✅ Attempt to parse JSON if body exists
-        try:
-            response_data = await response.json()
-            logging.info(
-                f"✅ Successfully linked {user_id} to plan {plan_id}: {response_data}"
-            )
-        except Exception:
-            logging.info(
-                f"✅ Successfully linked {user_id} to plan {plan_id}. (Non-JSON response: {response_text})"
-            )
-
     except Exception as e:
-        logging.error(f"❌ Error linking user {user_id}: {e}")
+        logger.error(f"❌ Error linking user {user_id} to plan {plan_id}: {e}")
+        raise PlanLinkError(f"{e.__class__.__name__} linking {user_id}: {e}") from e
+
+    logger.info(f"📡 Response Status: {response.status}")
+    if not response.ok:
+        logger.error(f"❌ HTTP {response.status} linking user {user_id} to plan {plan_id}")
+        raise PlanLinkError(f"HTTP {response.status} linking {user_id}")
+    logger.info(f"✅ Successfully linked {user_id} to plan {plan_id}")
 
 
 def get_plan_id_from_url(url: str) -> int:
@@ -378,7 +341,7 @@ async def link_users_to_plan(page: Page, users: list[str], keep_open: bool = Fal
             await page.get_by_role("dialog").locator('button:text("Dismiss")').click()
 
     except Exception as e:
-        logging.error(f"Error linking users to plan: {e}")
+        logger.error(f"Error linking users to plan: {e}")
 
 
 async def link_user_to_current_plan(page: Page, email: str, dismiss: bool = False):
@@ -446,7 +409,8 @@ async def dismiss_card_library(page: Page):
     await expect(card_library).to_be_hidden(timeout=ASSERTION_TIMEOUT)
 
 
-async def create_cards_in_card_library(page: Page, totalCards: int = 10):
+@timed
+async def create_cards_in_card_library(page: Page, totalCards: int = 10, typing: str = None):
     # Expand the card library
     card_library_btn = get_card_library_btn(page)
     await card_library_btn.click()
@@ -475,19 +439,20 @@ async def create_cards_in_card_library(page: Page, totalCards: int = 10):
         # Click into the editor body and type
         await floating_form.get_by_test_id("editor-body").click()
         await expect(active_editor).to_be_attached(timeout=ASSERTION_TIMEOUT)
-        await active_editor.press_sequentially(card_text)
+        await type_text(page, active_editor, card_text, typing, delay=(0, 0))
 
         # Wait until the active editor contains the text
         await expect(editor_body.locator("p")).to_contain_text(card_text)
         await floating_form.locator('button[type="submit"]').click()
         # Wait until the editor no longer has the copy
         await expect(editor_body.locator("p")).not_to_contain_text(card_text)
-        await page.wait_for_timeout(rand_between(100, 500))
+        await pause(100, 500, mode=typing)
 
     # Now, dismiss the card library
     await dismiss_card_library(page)
 
 
+@timed
 async def title_page(page: Page, page_title: str):
     """Titles a page"""
 
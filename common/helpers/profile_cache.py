@@ -0,0 +1,46 @@
+import time
+import weakref
+from playwright.async_api import BrowserContext
+from config import PROFILE_CACHE_TTL
+
+
+class ProfileCache:
+    """/api/auth/profile responses, cached per browser context.
+
+    A context holds one user's cookies, so it is the natural scope for the
+    profile. Entries go away with the context and expire after `ttl` seconds.
+    Call `invalidate` whenever the context's identity changes (login,
+    registration, cookies loaded from a pooled account).
+    """
+
+    def __init__(self, ttl: float = PROFILE_CACHE_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = weakref.WeakKeyDictionary()
+
+    def get(self, context: BrowserContext):
+        """Returns the cached profile, or None (counted as a miss)"""
+        entry = self._entries.get(context)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def set(self, context: BrowserContext, profile: dict):
+        self._entries[context] = (time.monotonic(), profile)
+
+    def invalidate(self, context: BrowserContext):
+        self._entries.pop(context, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+profile_cache = ProfileCache()
@@ -0,0 +1,80 @@
+import time
+from playwright.async_api import Page, Error
+from common.helpers.global_selectors import SPINNER_SELECTOR, USER_AVATAR_SELECTOR
+from common.helpers.metrics import fire_metric, action_name
+from common.helpers.logs import get_logger
+from config import READINESS_TIMEOUT
+
+logger = get_logger(__name__)
+
+# Checks every readiness condition inside the page and resolves as soon as they
+# all hold. A MutationObserver re-checks on DOM changes, so no CDP round trips
+# are made while waiting. The slow interval only covers visibility changes
+# that come from stylesheets rather than DOM mutations.
+READINESS_SCRIPT = """
+({ spinnerSelector, avatarSelector, timeout }) => new Promise((resolve, reject) => {
+  const start = performance.now();
+  const isVisible = (el) => {
+    if (!el.getClientRects().length) return false;
+    return getComputedStyle(el).visibility !== "hidden";
+  };
+  const isReady = () =>
+    document.readyState === "complete" &&
+    ![...document.querySelectorAll(spinnerSelector)].some(isVisible) &&
+    [...document.querySelectorAll(avatarSelector)].some(isVisible);
+
+  let observer, interval, timer;
+  const cleanup = () => {
+    observer.disconnect();
+    clearInterval(interval);
+    clearTimeout(timer);
+    document.removeEventListener("readystatechange", check);
+  };
+  function check() {
+    if (isReady()) {
+      cleanup();
+      resolve(performance.now() - start);
+    }
+  }
+
+  observer = new MutationObserver(check);
+  observer.observe(document, { childList: true, subtree: true, attributes: true });
+  document.addEventListener("readystatechange", check);
+  interval = setInterval(check, 250);
+  timer = setTimeout(() => {
+    cleanup();
+    reject(new Error(`Page not ready within ${timeout}ms`));
+  }, timeout);
+  check();
+})
+"""
+
+
+async def wait_until_ready(
+    page: Page,
+    timeout: int = READINESS_TIMEOUT,
+    name: str = None,
+) -> float:
+    """Waits for the page to be ready and reports the time-to-ready in ms"""
+    # Named after the enclosing actions, e.g. "random artifact > wait_for_page_to_fully_load"
+    name = name or action_name("wait_for_page_to_fully_load")
+    args = {"spinnerSelector": SPINNER_SELECTOR, "avatarSelector": USER_AVATAR_SELECTOR}
+    # Time spent on documents that navigated away before they were ready
+    discarded = 0.0
+
+    while True:
+        attempt_start = time.perf_counter()
+        try:
+            args["timeout"] = max(timeout - discarded, 0)
+            time_to_ready = discarded + await page.evaluate(READINESS_SCRIPT, args)
+            fire_metric("READY", name, time_to_ready)
+            return time_to_ready
+        except Error as e:
+            discarded += (time.perf_counter() - attempt_start) * 1000
+            # A navigation destroys the script's context; start over on the new document
+            if "Execution context was destroyed" in e.message and discarded < timeout:
+                logger.debug("Navigation during readiness check, retrying...")
+                continue
+            fire_metric("READY", name, discarded, exception=e)
+            logger.error(f"Error waiting for page to load: {e}")
+            raise
@@ -0,0 +1,129 @@
+import re
+import json
+import time
+from playwright.async_api import Page, Request, Response, WebSocket
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+# Only application traffic is replayed, the browser fetches static assets itself
+RECORDED_RESOURCE_TYPES = ("xhr", "fetch")
+RECORDED_HEADERS = ("content-type", "accept")
+
+
+class SessionRecorder:
+    """Captures the API and websocket traffic of one browser-driven session."""
+
+    def __init__(self, page: Page):
+        self.started = time.perf_counter()
+        self.steps = []
+        self._by_request = {}
+        page.on("request", self._on_request)
+        page.on("response", self._on_response)
+        page.on("websocket", self._on_websocket)
+
+    def _offset(self) -> int:
+        return int((time.perf_counter() - self.started) * 1000)
+
+    def _on_request(self, request: Request):
+        if request.resource_type not in RECORDED_RESOURCE_TYPES:
+            return
+        if not request.url.startswith(HOST_URL):
+            return
+        step = {
+            "type": "http",
+            "offset_ms": self._offset(),
+            "method": request.method,
+            "path": request.url[len(HOST_URL) :],
+            "headers": {
+                k: v for k, v in request.headers.items() if k in RECORDED_HEADERS
+            },
+            "body": request.post_data,
+            "status": None,
+        }
+        self._by_request[request] = step
+        self.steps.append(step)
+
+    def _on_response(self, response: Response):
+        step = self._by_request.pop(response.request, None)
+        if step:
+            step["status"] = response.status
+
+    def _on_websocket(self, ws: WebSocket):
+        step = {
+            "type": "websocket",
+            "offset_ms": self._offset(),
+            "url": ws.url,
+            "frames": [],
+        }
+        self.steps.append(step)
+
+        def on_frame(payload):
+            if isinstance(payload, bytes):
+                return  # Binary frames can't be parameterized, so they're skipped
+            step["frames"].append(
+                {"offset_ms": self._offset() - step["offset_ms"], "payload": payload}
+            )
+
+        ws.on("framesent", on_frame)
+
+
+def compile_scenario(steps: list[dict], substitutions: dict) -> dict:
+    """Turns recorded steps into a replayable scenario.
+
+    Every occurrence of a substitution value (ids, usernames, ...) becomes a
+    `{{name}}` placeholder, longest values first so that e.g. an id of 12
+    doesn't eat into an id of 1234. Numeric values only match whole numbers.
+    """
+    patterns = []
+    for name, value in sorted(
+        substitutions.items(), key=lambda kv: len(str(kv[1])), reverse=True
+    ):
+        if value is None or value == "":
+            continue
+        value = str(value)
+        pattern = rf"(?<!\d){re.escape(value)}(?!\d)" if value.isdigit() else re.escape(value)
+        patterns.append((re.compile(pattern), "{{" + name + "}}"))
+
+    def parameterize(text):
+        if text is None:
+            return None
+        for pattern, placeholder in patterns:
+            text = pattern.sub(placeholder, text)
+        return text
+
+    compiled = []
+    for step in steps:
+        step = dict(step)
+        if step["type"] == "http":
+            step["path"] = parameterize(step["path"])
+            step["body"] = parameterize(step["body"])
+        else:
+            step["url"] = parameterize(step["url"])
+            step["frames"] = [
+                {**f, "payload": parameterize(f["payload"])} for f in step["frames"]
+            ]
+        compiled.append(step)
+
+    return {"variables": sorted(substitutions), "steps": compiled}
+
+
+def render(template: str, variables: dict) -> str:
+    """Fills the `{{name}}` placeholders of a compiled step"""
+    if template is None:
+        return None
+    return re.sub(
+        r"\{\{(\w+)\}\}", lambda m: str(variables.get(m.group(1), m.group(0))), template
+    )
+
+
+def save_scenario(scenario: dict, path: str = REPLAY_SCENARIO_FILE):
+    with open(path, "w") as f:
+        json.dump(scenario, f, indent=2)
+    logger.info(f"🎙️ Saved replay scenario with {len(scenario['steps'])} steps to {path}")
+
+
+def load_scenario(path: str = REPLAY_SCENARIO_FILE) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
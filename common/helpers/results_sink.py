@@ -0,0 +1,190 @@
+import os
+import time
+import sqlite3
+from collections import deque
+import gevent
+from gevent.event import Event
+from common.helpers import metrics
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    request_type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    response_time REAL,
+    response_length INTEGER,
+    failed INTEGER NOT NULL,
+    exception TEXT,
+    user_ordinal INTEGER,
+    shard INTEGER,
+    concurrency INTEGER
+);
+CREATE TABLE IF NOT EXISTS gauges (
+    ts REAL NOT NULL,
+    name TEXT NOT NULL,
+    value REAL,
+    unit TEXT,
+    concurrency INTEGER
+);
+CREATE TABLE IF NOT EXISTS run (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class ResultsSink:
+    """Streams every Locust request event into an append-only SQLite file.
+
+    Gauges (metrics.record_gauge) go to a table of their own, so rates and
+    counts never mix with latencies. Samples are buffered in memory and
+    written in batches from gevent's threadpool, so the disk never blocks the
+    users. The buffer is bounded: when writes fall behind, new samples are
+    dropped and counted rather than growing memory. Each Locust process writes
+    its own file; `report.py` reads any number of them.
+    """
+
+    def __init__(
+        self,
+        environment,
+        path: str,
+        run_id: str = None,
+        max_buffer: int = RESULTS_MAX_BUFFER,
+        flush_interval: float = RESULTS_FLUSH_INTERVAL,
+    ):
+        self.environment = environment
+        self.path = path
+        self.run_id = run_id
+        self.max_buffer = max_buffer
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self._buffer = deque()
+        self._gauges = deque()  # Rates and counts (metrics.record_gauge), not latencies
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._greenlet = None
+        self._stopping = Event()
+
+    @classmethod
+    def for_run(cls, environment, run_id: str = None, directory: str = RESULTS_DIR):
+        """A sink writing to a new file named after the run and the process.
+
+        Every process of a run gets the same `run_id` (from the master), so
+        report.py can pick all of a run's files by their name.
+        """
+        os.makedirs(directory, exist_ok=True)
+        node = getattr(environment.runner, "client_id", None) or "local"
+        run_id = run_id or time.strftime("%Y%m%d-%H%M%S")
+        return cls(environment, os.path.join(directory, f"run-{run_id}-{node}.sqlite"), run_id)
+
+    def start(self):
+        self._db.executemany(
+            "INSERT OR REPLACE INTO run VALUES (?, ?)",
+            [
+                ("run_id", str(self.run_id)),
+                ("started", str(time.time())),
+                ("host", str(self.environment.host)),
+            ],
+        )
+        self._db.commit()
+        self.environment.events.request.add_listener(self.on_request)
+        metrics.gauge_listeners.append(self.on_gauge)
+        self._greenlet = gevent.spawn(self._flush_forever)
+        logger.info(f"💾 Streaming samples to {self.path}")
+
+    def on_request(
+        self,
+        request_type,
+        name,
+        response_time,
+        response_length,
+        exception=None,
+        context=None,
+        start_time=None,
+        **kwargs,
+    ):
+        if len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return
+        context = context or {}
+        runner = self.environment.runner
+        self._buffer.append(
+            (
+                start_time or time.time(),
+                request_type,
+                name,
+                response_time,
+                response_length or 0,
+                1 if exception else 0,
+                str(exception)[:500] if exception else None,
+                context.get("user_ordinal"),
+                context.get("shard"),
+                # The global count the user last saw, else this process' user count
+                context.get("concurrent_users") or (runner.user_count if runner else None),
+            )
+        )
+
+    def on_gauge(self, name, value, unit, context):
+        if len(self._gauges) >= self.max_buffer:
+            self.dropped += 1
+            return
+        runner = self.environment.runner
+        self._gauges.append(
+            (
+                time.time(),
+                name,
+                value,
+                unit,
+                context.get("concurrent_users") or (runner.user_count if runner else None),
+            )
+        )
+
+    def _write(self, batch: list, gauges: list):
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", batch
+            )
+            self._db.executemany("INSERT INTO gauges VALUES (?, ?, ?, ?, ?)", gauges)
+
+    def flush(self):
+        """Writes the buffered samples and gauges (off the gevent hub)"""
+        batch = []
+        while self._buffer:
+            batch.append(self._buffer.popleft())
+        gauges = []
+        while self._gauges:
+            gauges.append(self._gauges.popleft())
+        if batch or gauges:
+            gevent.get_hub().threadpool.apply(self._write, (batch, gauges))
+            self.written += len(batch)
+
+    def _flush_forever(self):
+        while not self._stopping.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Failed to write samples to {self.path}: {e}")
+
+    def stop(self):
+        """Writes what is left and closes the file"""
+        self.environment.events.request.remove_listener(self.on_request)
+        if self.on_gauge in metrics.gauge_listeners:
+            metrics.gauge_listeners.remove(self.on_gauge)
+        if self._greenlet:
+            # Let a write in progress finish: killing it would lose the batch
+            # and leave the pool thread on the connection we are about to use
+            self._stopping.set()
+            self._greenlet.join()
+        self.flush()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO run VALUES (?, ?)",
+            [("stopped", str(time.time())), ("dropped", str(self.dropped))],
+        )
+        self._db.commit()
+        self._db.close()
+        logger.info(
+            f"💾 {self.written} samples written to {self.path}, {self.dropped} dropped"
+        )
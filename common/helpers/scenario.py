@@ -0,0 +1,267 @@
+import os
+import json
+import inspect
+import random
+import asyncio
+import time
+from collections import Counter
+from playwright.async_api import Page
+from common.helpers.playwright import (
+    edit_order,
+    create_cards_in_card_library,
+    create_random_artifact,
+    title_page,
+    wait_for_page_to_fully_load,
+)
+from common.helpers.collab import arm_collab_observer
+from common.helpers.text_input import TYPING_MODES
+from common.helpers.captures import checked_action
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+
+class ScenarioConfigError(ValueError):
+    """The scenario file does not describe a runnable workload"""
+
+
+# Used when SCENARIO_FILE does not exist. The same mix the session always ran:
+# ten picks between editing, the card library and a new artifact.
+DEFAULT_SCENARIO = {
+    "iterations": 10,
+    "pacing": 0,
+    "think_time": {"distribution": "constant", "seconds": 0},
+    "actions": {
+        "edit order": {"weight": 1, "params": {"edits": 5}},
+        "card library": {"weight": 1, "params": {"min_cards": 1, "max_cards": 4}},
+        "random artifact": {"weight": 1},
+    },
+}
+
+
+async def do_edit_order(page: Page, session: dict, edits: int = 5, typing: str = None):
+    """Makes `edits` edits to the shared order"""
+    for i in range(edits):
+        await edit_order(page, typing=typing)
+
+
+async def do_card_library(
+    page: Page, session: dict, min_cards: int = 1, max_cards: int = 4, typing: str = None
+):
+    """Creates a random number of cards in the card library"""
+    await create_cards_in_card_library(page, random.randint(min_cards, max_cards), typing)
+
+
+async def do_random_artifact(page: Page, session: dict):
+    """Creates a random artifact, then goes back to the shared order"""
+    await create_random_artifact(page)
+    await page.goto(session["shared_order_url"])
+    await wait_for_page_to_fully_load(page)
+    if COLLAB_LATENCY:
+        await arm_collab_observer(page)
+
+
+async def do_title_page(page: Page, session: dict):
+    """Retitles the shared order with the current user count"""
+    await title_page(page, f"Shared Order [{session['concurrent_users']}] Concurrent Users")
+
+
+# Action type -> helper. A scenario action's name is its type unless it sets "type".
+ACTION_TYPES = {
+    "edit order": do_edit_order,
+    "card library": do_card_library,
+    "random artifact": do_random_artifact,
+    "title page": do_title_page,
+}
+
+# Params that count what the action is made of, so it needs at least one
+PARAM_MINIMUMS = {"edits": 1, "min_cards": 1, "max_cards": 1}
+
+THINK_TIME_DISTRIBUTIONS = {
+    "constant": (("seconds",), lambda p: p["seconds"]),
+    "uniform": (("min", "max"), lambda p: random.uniform(p["min"], p["max"])),
+    "exponential": (("mean",), lambda p: random.expovariate(1 / p["mean"])),
+    "lognormal": (("mu", "sigma"), lambda p: random.lognormvariate(p["mu"], p["sigma"])),
+}
+
+
+def is_number(value) -> bool:
+    """JSON has no int/float distinction for whole numbers, and bools are not numbers here"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def validate_think_time(think_time: dict, where: str):
+    distribution = think_time.get("distribution")
+    if distribution not in THINK_TIME_DISTRIBUTIONS:
+        raise ScenarioConfigError(
+            f"{where}: unknown think time distribution {distribution!r}, "
+            f"expected one of {sorted(THINK_TIME_DISTRIBUTIONS)}"
+        )
+    for key in THINK_TIME_DISTRIBUTIONS[distribution][0]:
+        value = think_time.get(key)
+        if not is_number(value):
+            raise ScenarioConfigError(f"{where}: think time {key!r} must be a number")
+        if value < 0 and key != "mu":  # The lognormal's mu is a log, so it can be negative
+            raise ScenarioConfigError(f"{where}: think time {key!r} must not be negative")
+    if distribution == "uniform" and think_time["min"] > think_time["max"]:
+        raise ScenarioConfigError(f"{where}: think time min is above max")
+    if distribution == "exponential" and think_time["mean"] <= 0:
+        raise ScenarioConfigError(f"{where}: think time mean must be positive")
+
+
+def validate_iterations(iterations, where: str):
+    if is_int(iterations) and iterations > 0:
+        return
+    if (
+        isinstance(iterations, dict)
+        and is_int(iterations.get("min"))
+        and is_int(iterations.get("max"))
+        and 0 < iterations["min"] <= iterations["max"]
+    ):
+        return
+    raise ScenarioConfigError(f"{where}: iterations must be a positive int or {{min, max}}")
+
+
+def validate_params(params: dict, helper, where: str):
+    """Checks the params by name and by the type of the helper's defaults"""
+    if not isinstance(params, dict):
+        raise ScenarioConfigError(f"{where}: params must be an object")
+    accepted = dict(list(inspect.signature(helper).parameters.items())[2:])
+    if set(params) - set(accepted):
+        raise ScenarioConfigError(
+            f"{where}: unknown params {sorted(set(params) - set(accepted))}, accepts {sorted(accepted)}"
+        )
+    for key, value in params.items():
+        parameter = accepted[key]
+        # The annotation when there is one (defaults of None say nothing), else the default's type
+        expected = (
+            parameter.annotation
+            if parameter.annotation is not inspect.Parameter.empty
+            else type(parameter.default)
+        )
+        ok = isinstance(value, expected) and not (isinstance(value, bool) and expected is not bool)
+        if expected is float:
+            ok = is_number(value)
+        if not ok:
+            raise ScenarioConfigError(
+                f"{where}: param {key!r} must be {expected.__name__}, got {value!r}"
+            )
+        minimum = PARAM_MINIMUMS.get(key, 0)
+        if expected in (int, float) and value < minimum:
+            raise ScenarioConfigError(
+                f"{where}: param {key!r} must be at least {minimum}, got {value!r}"
+            )
+
+
+def validate_scenario(scenario: dict) -> dict:
+    """Checks the scenario and returns it. Raises ScenarioConfigError."""
+    if not isinstance(scenario, dict):
+        raise ScenarioConfigError("The scenario must be a JSON object")
+    unknown = set(scenario) - {"iterations", "pacing", "think_time", "actions"}
+    if unknown:
+        raise ScenarioConfigError(f"Unknown scenario keys: {sorted(unknown)}")
+
+    validate_iterations(scenario.get("iterations", 1), "scenario")
+    pacing = scenario.get("pacing", 0)
+    if not is_number(pacing) or pacing < 0:
+        raise ScenarioConfigError("scenario: pacing must be a non-negative number of seconds")
+    if "think_time" in scenario:
+        validate_think_time(scenario["think_time"], "scenario")
+
+    actions = scenario.get("actions")
+    if not isinstance(actions, dict) or not actions:
+        raise ScenarioConfigError("scenario: at least one action is required")
+    for name, spec in actions.items():
+        where = f"action {name!r}"
+        if not isinstance(spec, dict):
+            raise ScenarioConfigError(f"{where}: must be an object")
+        action_type = spec.get("type", name)
+        if action_type not in ACTION_TYPES:
+            raise ScenarioConfigError(
+                f"{where}: unknown type {action_type!r}, expected one of {sorted(ACTION_TYPES)}"
+            )
+        weight = spec.get("weight")
+        if not is_number(weight) or weight < 0:
+            raise ScenarioConfigError(f"{where}: weight must be a non-negative number")
+        if "think_time" in spec:
+            validate_think_time(spec["think_time"], where)
+        params = spec.get("params", {})
+        validate_params(params, ACTION_TYPES[action_type], where)
+        if action_type == "card library" and params.get("min_cards", 1) > params.get("max_cards", 4):
+            raise ScenarioConfigError(f"{where}: min_cards is above max_cards")
+        if params.get("typing", TYPING_MODES[0]) not in TYPING_MODES:
+            raise ScenarioConfigError(f"{where}: typing must be one of {list(TYPING_MODES)}")
+
+    if not any(spec["weight"] > 0 for spec in actions.values()):
+        raise ScenarioConfigError("scenario: every action has weight 0")
+    return scenario
+
+
+def load_scenario(path: str = SCENARIO_FILE) -> dict:
+    """Reads and validates the scenario file, or returns the default scenario"""
+    if not os.path.exists(path):
+        logger.info(f"📋 No {path}, running the default scenario")
+        return DEFAULT_SCENARIO
+    with open(path, "r") as f:
+        try:
+            scenario = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ScenarioConfigError(f"{path}: {e}") from e
+    return validate_scenario(scenario)
+
+
+class ScenarioEngine:
+    """Runs a validated scenario on a page and keeps count of the actions it picked.
+
+    Each iteration picks one action by weight, runs it as a timed `action`
+    and then sleeps for the action's think time (or the scenario's). With
+    pacing set, an iteration is padded to at least that many seconds.
+    """
+
+    def __init__(self, scenario: dict):
+        self.scenario = scenario
+        self.names = list(scenario["actions"])
+        self.weights = [scenario["actions"][n]["weight"] for n in self.names]
+        self.achieved = Counter()
+
+    def iterations(self) -> int:
+        iterations = self.scenario.get("iterations", 1)
+        if isinstance(iterations, dict):
+            return random.randint(iterations["min"], iterations["max"])
+        return iterations
+
+    def think_time(self, name: str) -> float:
+        think_time = self.scenario["actions"][name].get("think_time") or self.scenario.get("think_time")
+        if not think_time:
+            return 0
+        return THINK_TIME_DISTRIBUTIONS[think_time["distribution"]][1](think_time)
+
+    async def run(self, page: Page, session: dict):
+        """Runs one session's worth of iterations"""
+        pacing = self.scenario.get("pacing", 0)
+        for i in range(self.iterations()):
+            start = time.monotonic()
+            name = random.choices(self.names, weights=self.weights)[0]
+            spec = self.scenario["actions"][name]
+            self.achieved[name] += 1
+            async with checked_action(page, name):
+                await ACTION_TYPES[spec.get("type", name)](page, session, **spec.get("params", {}))
+            await asyncio.sleep(self.think_time(name))
+            remaining = pacing - (time.monotonic() - start)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+    def mix_report(self) -> list:
+        """One log line per action: target vs achieved share of the picks"""
+        total_weight = sum(self.weights)
+        total = sum(self.achieved.values())
+        lines = [f"📋 Scenario mix over {total} actions (target → achieved):"]
+        for name, weight in zip(self.names, self.weights):
+            achieved = self.achieved[name] / total if total else 0
+            lines.append(f"\t - {name}: {weight / total_weight:.0%} → {achieved:.0%} ({self.achieved[name]})")
+        return lines
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import random
+import asyncio
+from collections import Counter
+from playwright.async_api import Browser
+from common.helpers.playwright import (
+    create_plan,
+    create_special_order,
+    title_page,
+    get_plan_id_from_url,
+    get_ts_string,
+)
+from common.helpers.interception import apply_interception_profile
+from common.helpers.logs import get_logger
+from config import *
+
+logger = get_logger(__name__)
+
+SHARD_POLICIES = ("uniform", "zipf", "fixed")
+
+
+def load_shard_manifest(path: str = SHARD_MANIFEST_FILE) -> list[dict]:
+    """Reads the shards written by setup.py, or returns none"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return json.load(f)["shards"]
+
+
+def save_shard_manifest(shards: list[dict], path: str = SHARD_MANIFEST_FILE):
+    """Persists the plans and orders the load is spread over"""
+    with open(path, "w") as f:
+        json.dump({"shards": shards}, f, indent=2)
+
+
+async def create_shard(browser: Browser, storage_state: dict, index: int, run: str) -> dict:
+    """Creates one plan with its "Shared Order" in a fresh supervisor context"""
+    context = await browser.new_context(storage_state=storage_state, **DEFAULT_BROWSER_OPTIONS)
+    await apply_interception_profile(context)
+    page = await context.new_page()
+    try:
+        start = time.time()
+        plan_url = await create_plan(page, f"TP - {run} - {index}")
+        time_to_create_plan = time.time() - start
+        order_url = await create_special_order(page)
+        await title_page(page, "Shared Order")
+        logger.info(f"🧩 Shard {index} created in {time_to_create_plan:.2f} seconds: {plan_url}")
+        return {
+            "index": index,
+            "plan_url": plan_url,
+            "plan_id": get_plan_id_from_url(plan_url),
+            "order_url": order_url,
+            "time_to_create_plan": f"{time_to_create_plan:.2f} seconds",
+        }
+    finally:
+        await context.close()
+
+
+async def create_shards(
+    browser: Browser,
+    storage_state: dict,
+    count: int = PLAN_SHARDS,
+    concurrency: int = SHARD_CONCURRENCY,
+) -> list[dict]:
+    """Creates `count` plans and orders, `concurrency` at a time.
+
+    Raises if any shard fails, so a run never starts on fewer plans than asked for.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    run = get_ts_string()
+
+    async def create(index):
+        async with semaphore:
+            return await create_shard(browser, storage_state, index, run)
+
+    logger.info(f"🧩 Creating {count} plan shards ({concurrency} at a time)...")
+    return list(await asyncio.gather(*[create(i) for i in range(count)]))
+
+
+class ShardAssigner:
+    """Spreads users over the shards by policy.
+
+    uniform: round-robin on the user's creation ordinal, so shards stay even.
+    zipf: shard k is picked with weight 1 / (k + 1) ** SHARD_ZIPF_S, a few hot plans and a long tail.
+    fixed: fills shards in order, `users_per_shard` each, wrapping around.
+    """
+
+    def __init__(
+        self,
+        shards: list[dict],
+        policy: str = SHARD_POLICY,
+        zipf_s: float = SHARD_ZIPF_S,
+        users_per_shard: int = SHARD_USERS_PER_PLAN,
+    ):
+        if policy not in SHARD_POLICIES:
+            raise ValueError(f"Unknown shard policy {policy!r}, expected one of {SHARD_POLICIES}")
+        self.shards = shards
+        self.policy = policy
+        self.users_per_shard = users_per_shard
+        self.weights = [1 / (k + 1) ** zipf_s for k in range(len(shards))]
+        self.assigned = Counter()
+
+    def assign(self, ordinal: int) -> dict:
+        """Picks the shard of the user with the given creation ordinal (from 1)"""
+        position = ordinal - 1
+        if self.policy == "zipf":
+            shard = random.choices(self.shards, weights=self.weights)[0]
+        elif self.policy == "fixed":
+            shard = self.shards[(position // self.users_per_shard) % len(self.shards)]
+        else:
+            shard = self.shards[position % len(self.shards)]
+        self.assigned[shard["index"]] += 1
+        return shard
+
+    def summary(self) -> list:
+        lines = [f"🧩 Users per shard ({self.policy}):"]
+        for shard in self.shards:
+            lines.append(f"\t - shard {shard['index']} (plan {shard['plan_id']}): {self.assigned[shard['index']]}")
+        return lines
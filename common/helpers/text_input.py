@@ -0,0 +1,77 @@
+import random
+import asyncio
+from playwright.async_api import Page, Locator
+from faker import Faker
+from config import *
+
+# How text gets into the editors, from most realistic to most throughput:
+#   keystroke: one key event per character, with a delay between them
+#   burst:     a few words per input event, paced at TYPING_WPM
+#   bulk:      the whole text in one input event, like a paste
+TYPING_MODES = ("keystroke", "burst", "bulk")
+
+
+class TextCorpus:
+    """Sentences generated once, so the users don't call Faker while editing"""
+
+    def __init__(self, size: int = TEXT_CORPUS_SIZE, seed: int = None):
+        fake = Faker()
+        if seed is not None:
+            fake.seed_instance(seed)
+        self.sentences = [fake.sentence() for _ in range(size)]
+
+    def sentence(self) -> str:
+        return random.choice(self.sentences)
+
+
+_corpus = None
+
+
+def random_sentence() -> str:
+    """A sentence from the corpus, generated on first use"""
+    global _corpus
+    if _corpus is None:
+        _corpus = TextCorpus()
+    return _corpus.sentence()
+
+
+def validate_typing_mode(mode: str) -> str:
+    if mode not in TYPING_MODES:
+        raise ValueError(f"Unknown typing mode {mode!r}, expected one of {TYPING_MODES}")
+    return mode
+
+
+async def type_text(
+    page: Page,
+    editor: Locator,
+    text: str,
+    mode: str = None,
+    delay: tuple = TYPING_KEYSTROKE_DELAY,
+):
+    """Types `text` into the (focused) editor in the given typing mode.
+
+    `delay` is the (min, max) milliseconds between keystrokes in keystroke mode.
+    """
+    mode = validate_typing_mode(mode or TYPING_MODE)
+    if mode == "keystroke":
+        await editor.press_sequentially(text, delay=float(random.randint(*delay)))
+        return
+
+    await editor.focus()
+    if mode == "bulk":
+        await page.keyboard.insert_text(text)
+        return
+
+    words = text.split(" ")
+    for i in range(0, len(words), TYPING_BURST_WORDS):
+        chunk = words[i : i + TYPING_BURST_WORDS]
+        last = i + TYPING_BURST_WORDS >= len(words)
+        await page.keyboard.insert_text(" ".join(chunk) + ("" if last else " "))
+        await asyncio.sleep(len(chunk) / TYPING_WPM * 60)
+
+
+async def pause(min_ms: int, max_ms: int = None, mode: str = None):
+    """A think pause between editing steps; bulk mode skips them"""
+    if (mode or TYPING_MODE) == "bulk":
+        return
+    await asyncio.sleep(random.randint(min_ms, max_ms or min_ms) / 1000)
@@ -0,0 +1,161 @@
+import re
+import time
+from collections import defaultdict
+import gevent
+from playwright.async_api import BrowserContext, Page, WebSocket
+from common.helpers.metrics import fire_metric, record_gauge
+from common.helpers.network import template_url
+from common.helpers.collab import concurrency_bucket
+from config import *
+
+# Request/ack correlation: the first id-like field of a text frame, e.g.
+# {"type": "op", "id": "a1b2", ...} sent and {"type": "ack", "id": "a1b2"} received.
+# Only received frames shaped like an ack count, so other users' broadcast ops
+# that happen to carry the same id or seq can't close a round trip.
+_CORRELATION = re.compile(
+    r'"(?:%s)"\s*:\s*"?([\w-]{1,64})' % "|".join(map(re.escape, WS_CORRELATION_KEYS))
+)
+_ACK = re.compile(WS_ACK_PATTERN)
+
+
+class WebSocketError(Exception):
+    pass
+
+
+class _Socket:
+    """Counters of one open websocket"""
+
+    def __init__(self, template: str, users):
+        self.template = template
+        self.users = users  # Callable: the owning user's last known concurrent-user count
+        self.opened = time.monotonic()
+        self.received = 0  # Frames since the last flush
+        self.pending = {}  # Correlation id -> monotonic time it was sent
+
+
+class WebSocketTelemetry:
+    """Frames, bytes, rates, lifetimes and round trips of the pages' websockets.
+
+    Like NetworkTelemetry, the frame handlers only count. Every
+    WS_FLUSH_INTERVAL seconds the rates go out as gauges (metrics.record_gauge,
+    stored by the results sink): frames and bytes per second sent and received
+    per URL template, frames received per second per socket grouped by
+    concurrent users (the server's fan-out to each user) and the number of open
+    sockets. Only durations are `WS` request events: round trips of sent frames
+    acknowledged by id, and connection lifetimes when a socket closes.
+    """
+
+    def __init__(self, flush_interval: float = WS_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.opened = 0
+        self.closed = 0
+        self.totals = defaultdict(lambda: [0, 0])  # direction -> [frames, bytes], whole run
+        self._sockets = {}  # WebSocket -> _Socket, the open ones
+        self._frames = defaultdict(lambda: [0, 0])  # (template, direction) -> [frames, bytes]
+        self._round_trips = defaultdict(list)  # template -> [ms]
+        self._flushed = time.monotonic()
+        self._greenlet = None
+
+    def attach(self, context: BrowserContext, users=lambda: 0):
+        """Watches the websockets of every page in the context"""
+        context.on("page", lambda page: self.watch(page, users))
+
+    def watch(self, page: Page, users=lambda: 0):
+        page.on("websocket", lambda ws: self._on_open(ws, users))
+
+    def _on_open(self, ws: WebSocket, users):
+        socket = _Socket(template_url(ws.url), users)
+        self._sockets[ws] = socket
+        self.opened += 1
+        ws.on("framesent", lambda payload: self._on_frame(socket, "sent", payload))
+        ws.on("framereceived", lambda payload: self._on_frame(socket, "received", payload))
+        ws.on("socketerror", lambda error: self._on_error(socket, error))
+        ws.on("close", lambda ws: self._on_close(ws))
+
+    def _on_frame(self, socket: _Socket, direction: str, payload):
+        counts = self._frames[(socket.template, direction)]
+        counts[0] += 1
+        counts[1] += len(payload)
+        if direction == "received":
+            socket.received += 1
+        if not WS_ROUND_TRIPS or isinstance(payload, bytes):
+            return
+        if direction == "received" and not _ACK.search(payload):
+            return
+        match = _CORRELATION.search(payload)
+        if not match:
+            return
+        if direction == "sent":
+            if len(socket.pending) < WS_MAX_PENDING:
+                socket.pending[match.group(1)] = time.monotonic()
+            return
+        sent = socket.pending.pop(match.group(1), None)
+        if sent is not None:
+            self._round_trips[socket.template].append((time.monotonic() - sent) * 1000)
+
+    def _on_error(self, socket: _Socket, error: str):
+        fire_metric("WS", f"{socket.template} error", 0, exception=WebSocketError(error))
+
+    def _on_close(self, ws: WebSocket):
+        socket = self._sockets.pop(ws, None)
+        if socket is None:
+            return
+        self.closed += 1
+        fire_metric("WS", f"{socket.template} lifetime", (time.monotonic() - socket.opened) * 1000)
+
+    def flush(self):
+        """Reports the rates and round trips since the last flush"""
+        now = time.monotonic()
+        elapsed = max(now - self._flushed, 0.001)
+        self._flushed = now
+        frames, self._frames = self._frames, defaultdict(lambda: [0, 0])
+        round_trips, self._round_trips = self._round_trips, defaultdict(list)
+
+        for (template, direction), (count, size) in frames.items():
+            record_gauge(f"WS {template} {direction}", count / elapsed, "frames/s")
+            record_gauge(f"WS {template} {direction}", size / elapsed, "bytes/s")
+            self.totals[direction][0] += count
+            self.totals[direction][1] += size
+        for template, times in round_trips.items():
+            for ms in times:
+                fire_metric("WS", f"{template} round trip", ms)
+        for socket in list(self._sockets.values()):
+            bucket = concurrency_bucket(socket.users(), WS_USER_BUCKET)
+            record_gauge(
+                f"WS {socket.template} received per socket ({bucket})",
+                socket.received / elapsed,
+                "frames/s",
+            )
+            socket.received = 0
+            # Ids that never came back are not acks; don't let them pile up
+            socket.pending = {
+                key: sent for key, sent in socket.pending.items() if now - sent < WS_ACK_TIMEOUT
+            }
+        if self._sockets:
+            record_gauge("WS open sockets", len(self._sockets), "sockets")
+
+    def _flush_forever(self):
+        while True:
+            gevent.sleep(self.flush_interval)
+            self.flush()
+
+    def start(self):
+        if self._greenlet is None:
+            self._flushed = time.monotonic()
+            self._greenlet = gevent.spawn(self._flush_forever)
+
+    def stop(self):
+        if self._greenlet is not None:
+            self._greenlet.kill()
+            self._greenlet = None
+        self.flush()
+
+    def summary(self) -> str:
+        sent, received = self.totals["sent"], self.totals["received"]
+        return (
+            f"🔌 Websockets: {self.opened} opened, {self.closed} closed, {len(self._sockets)} still open; "
+            f"{sent[0]} frames ({sent[1]} bytes) sent, {received[0]} frames ({received[1]} bytes) received"
+        )
+
+
+ws_telemetry = WebSocketTelemetry()
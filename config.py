@@ -1,5 +1,7 @@
-# Target site URL for the load test
-HOST_URL = "https://17619-test.preview.onebrief.com"
+import os
+
+# Target site URL for the load test. Override with the HOST_URL environment variable, e.g. to run against the local mock server (see mock_server/server.py).
+HOST_URL = os.environ.get("HOST_URL", "https://17619-test.preview.onebrief.com")
 
 # Supervisor user credentials. These are the credentials used for creating a shared plan in which spawned Locust users will navigate to and interact with.
 SUPERVISOR_USERNAME = "****"
@@ -18,3 +20,129 @@ DEFAULT_BROWSER_OPTIONS = {
     "viewport": {"width": 1400, "height": 768},
     "permissions": ["clipboard-read", "clipboard-write"],
 }
+
+# Pre-provisioned account pool. setup.py registers this many accounts up front and links them to the shared plan, so Locust users can start on the shared order instead of filling in the sign-up form. Set to 0 to always register through the UI.
+ACCOUNT_POOL_FILE = "account_pool.json"
+ACCOUNT_POOL_SIZE = 25
+ACCOUNT_POOL_CONCURRENCY = 5  # Registrations running at the same time during setup
+
+# Plan-linking service. Link requests from Locust users are queued and sent by a pool of workers sharing one API session for the supervisor.
+LINK_CONCURRENCY = 4  # Link requests in flight at the same time
+LINK_RETRIES = 3  # Attempts per user before the link is reported as failed
+LINK_RETRY_BACKOFF = 0.5  # Seconds, doubled after each failed attempt
+
+# Page readiness. The page is ready once the document is complete, no spinner is visible and the user avatar is visible.
+READINESS_TIMEOUT = 60000  # Milliseconds
+
+# Seconds a /api/auth/profile response is reused by the helpers before it is fetched again. 0 disables the cache.
+PROFILE_CACHE_TTL = 300
+
+# Protocol-level replay. With RECORD_SESSION on, the first completed Onebrief session is saved as a parameterized HTTP/websocket scenario that replayfile.py replays without a browser.
+RECORD_SESSION = False
+REPLAY_SCENARIO_FILE = "replay_scenario.json"
+REPLAY_THINK_TIME_SCALE = 1.0  # Multiplier for the recorded gaps between steps. 0 = back to back
+
+# Warm browser contexts. Each virtual user keeps its context (cache, cookies, booted app) across task iterations and recycles it after this many iterations or once the page's JS heap passes the threshold.
+CONTEXT_MAX_ITERATIONS = 10
+CONTEXT_MAX_HEAP_MB = 512  # 0 disables the memory check
+
+# Distributed coordination. Seconds a worker waits for the master to answer a coordination request (user registry, plan linking) in master/worker mode.
+COORDINATION_TIMEOUT = 60
+REGISTRY_MAX_INACTIVE = 10000  # Records of users that left, kept so a returning user keeps its creation order
+
+# Request interception profile for every browser context created by the load test and by setup.py: "full" (load everything), "no-media" (no images, video or fonts) or "api-only-assets" (also no analytics or map tiles).
+INTERCEPTION_PROFILE = "no-media"
+
+# Collaboration latency, off by default because it changes the documents under test. When on, edit_order stamps every edit with a token and the other users' pages report how long it took to show up, per bucket of COLLAB_USER_BUCKET concurrent users. Across machines the result includes their clock difference.
+COLLAB_LATENCY = False
+COLLAB_USER_BUCKET = 10
+COLLAB_MAX_LATENCY = 120000  # Milliseconds; older tokens are history, not propagation
+
+# Workload mix. Weighted actions, think times, iterations and pacing for each session; see scenario.json. Without the file the built-in default mix runs.
+SCENARIO_FILE = "scenario.json"
+
+# Open workload. With ARRIVAL_RATE above 0, sessions start at that many per minute (across all workers) no matter how long earlier sessions take, instead of each user looping with a think time. The user count (-u) caps how many sessions run at once; arrivals beyond ARRIVAL_MAX_BACKLOG waiting for a free user are dropped.
+ARRIVAL_RATE = 0
+ARRIVAL_PROCESS = "poisson"  # "poisson" (random gaps) or "constant"
+ARRIVAL_MAX_BACKLOG = 50
+
+# Plan shards. setup.py creates PLAN_SHARDS plans, each with its own "Shared Order", SHARD_CONCURRENCY at a time, and lists them in SHARD_MANIFEST_FILE. Users are spread over them by SHARD_POLICY: "uniform" (round-robin), "zipf" (a few hot plans, skew SHARD_ZIPF_S) or "fixed" (SHARD_USERS_PER_PLAN users per plan, filled in order).
+PLAN_SHARDS = 1
+SHARD_CONCURRENCY = 4
+SHARD_MANIFEST_FILE = "shards.json"
+SHARD_POLICY = "uniform"
+SHARD_ZIPF_S = 1.1
+SHARD_USERS_PER_PLAN = 10
+
+# Setup. setup.py reuses the stored supervisor session while it is valid. With SETUP_REUSE_PLAN (or --reuse-plan) it also keeps the previous run's plans and orders. With SETUP_ON_TEST_START the locustfile runs setup itself when the test starts, instead of reading the files of a separate run.
+SETUP_HEADLESS = True  # False (or --headful) to watch setup work
+SETUP_REUSE_PLAN = False
+SETUP_ON_TEST_START = False
+
+# Results sink. Every sample (name, time, latency, user ordinal, shard, concurrency) is streamed to a SQLite file per run and process in RESULTS_DIR; `python report.py` turns them into percentiles over time and by concurrency. Samples are written every RESULTS_FLUSH_INTERVAL seconds; beyond RESULTS_MAX_BUFFER waiting samples new ones are dropped (and counted).
+RESULTS_SINK = True
+RESULTS_DIR = "results"
+RESULTS_FLUSH_INTERVAL = 2
+RESULTS_MAX_BUFFER = 100000
+
+# Breaking-point search (breaking_point.py). Steps of BREAKING_POINT_STEP users from BREAKING_POINT_START, each ramped at BREAKING_POINT_SPAWN_RATE and held BREAKING_POINT_HOLD seconds. A step passes when every SLO (percentile of the matching stats rows, names matched as is or as the last part of a hierarchical name) and the failure ratio of BREAKING_POINT_FAILURE_TYPES hold over its own samples; SLOs with fewer than BREAKING_POINT_MIN_SAMPLES samples don't count. After the first failing step, "binary" bisects down to BREAKING_POINT_RESOLUTION users, "step" stops.
+BREAKING_POINT_START = 5
+BREAKING_POINT_STEP = 5
+BREAKING_POINT_MAX = 200
+BREAKING_POINT_SPAWN_RATE = 1
+BREAKING_POINT_HOLD = 180
+BREAKING_POINT_MAX_RAMP = 600  # Seconds; a ramp that takes longer is held and judged as is
+BREAKING_POINT_SEARCH = "binary"
+BREAKING_POINT_RESOLUTION = 2
+BREAKING_POINT_SLOS = [
+    {"type": "READY", "name": "wait_for_page_to_fully_load", "percentile": 95, "max_ms": 15000},
+    {"type": "ACTION", "name": "edit order", "percentile": 95, "max_ms": 60000},
+]
+BREAKING_POINT_MIN_SAMPLES = 5
+BREAKING_POINT_FAILURE_TYPES = ("ACTION", "READY", "NAV")
+BREAKING_POINT_MAX_FAILURE_RATIO = 0.05
+
+# Logging. Lines are queued and written to the log file (and stdout with LOG_CONSOLE) by a background thread; beyond LOG_QUEUE_SIZE queued lines new ones are dropped and counted. Levels and sample rates are per category: "user" (Onebrief.log), "locustfile", "setup" or a helper module such as "common.helpers.plan_linker" (a parent like "common.helpers" covers all of them). Sampling only thins out lines below WARNING. Passwords and cookie values are always redacted.
+LOG_LEVEL = "INFO"
+LOG_LEVELS = {"user": "INFO"}
+LOG_SAMPLE_RATES = {"user": 1.0}  # e.g. 0.1 keeps one in ten
+LOG_QUEUE_SIZE = 10000
+LOG_CONSOLE = True
+
+# Network telemetry. Browser requests of these resource types are grouped by URL template (ids collapsed to {id}) and reported as NET request events every NETWORK_FLUSH_INTERVAL seconds, with the browser's own timings; 4xx/5xx responses and failed requests count as failures. Templates beyond NETWORK_MAX_TEMPLATES are grouped as {other}.
+NETWORK_TELEMETRY = True
+NETWORK_RESOURCE_TYPES = ("document", "xhr", "fetch")
+NETWORK_FLUSH_INTERVAL = 5
+NETWORK_MAX_TEMPLATES = 500
+
+# Websocket telemetry. Every WS_FLUSH_INTERVAL seconds the pages' websocket rates are recorded as gauges in the results sink (not as Locust requests): frames and bytes per second sent and received, frames received per socket per bucket of WS_USER_BUCKET concurrent users, and open sockets. Lifetimes are WS request events. With WS_ROUND_TRIPS on, a sent frame's id (the first of WS_CORRELATION_KEYS in a text frame) is timed until a received frame matching WS_ACK_PATTERN carries it back, within WS_ACK_TIMEOUT seconds; set the pattern to the app's ack shape.
+WS_TELEMETRY = True
+WS_FLUSH_INTERVAL = 5
+WS_USER_BUCKET = 10
+WS_ROUND_TRIPS = False
+WS_CORRELATION_KEYS = ("id", "requestId", "ref", "seq")
+WS_ACK_PATTERN = r'"(?:type|kind|event)"\s*:\s*"ack"'
+WS_ACK_TIMEOUT = 30
+WS_MAX_PENDING = 1000  # Unacknowledged ids tracked per socket
+
+# Client error detection. A script in every page reports uncaught exceptions, unhandled rejections, console.error calls and error boundaries (added elements containing CLIENT_ERROR_BOUNDARY_TEXT) to a buffer per page on the Python side, so navigations don't lose them; each action drains the buffer when it ends and reports the errors as CLIENT failures of that action. Messages matching a CLIENT_ERROR_IGNORE regex are left out.
+CLIENT_ERRORS = True
+CLIENT_ERROR_BOUNDARY_TEXT = "Oops"
+CLIENT_ERROR_IGNORE = []  # e.g. [r"ResizeObserver loop"]
+CLIENT_ERROR_BUFFER = 100  # Errors kept per page between drains
+
+# Failure captures, off by default: tracing costs load-generator CPU in every context. "trace" records a Playwright trace chunk per action and saves it (to CAPTURE_DIR) only when the action fails, reports client errors or takes longer than its SLO; "screenshot" saves a screenshot in those cases instead; "off" saves nothing. CAPTURE_SUCCESS_RATE of the other actions are saved too. Nothing is saved once CAPTURE_MAX_MB are in CAPTURE_DIR.
+CAPTURE_MODE = "off"
+CAPTURE_TRACE_SCREENSHOTS = False  # Adds a screencast to the traces, at more CPU per action
+CAPTURE_DIR = "artifacts"
+CAPTURE_SLO_MS = 10000
+CAPTURE_SLOS = {"join shared order": 30000}  # Per action name
+CAPTURE_SUCCESS_RATE = 0.0  # e.g. 0.01 keeps one in a hundred
+CAPTURE_MAX_MB = 500
+
+# Typing fidelity of the editor helpers (edit_order, the card library): "keystroke" sends one key event per character (TYPING_KEYSTROKE_DELAY ms apart), "burst" inserts TYPING_BURST_WORDS words at a time at TYPING_WPM, "bulk" inserts the whole text at once and skips the think pauses. Scenario actions can override it with a "typing" param. The text comes from TEXT_CORPUS_SIZE sentences generated once per process.
+TYPING_MODE = "keystroke"
+TYPING_KEYSTROKE_DELAY = (25, 75)
+TYPING_BURST_WORDS = 3
+TYPING_WPM = 60
+TEXT_CORPUS_SIZE = 1000
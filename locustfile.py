@@ -1,55 +1,287 @@
 import json
+import time
+import weakref
+from contextlib import nullcontext
 import asyncio
-import logging
-from locust import task, between, events, run_single_user
-from locust_plugins.users.playwright import PageWithRetry, PlaywrightUser, pw, event
+import gevent
+from locust import task, between, constant, events, run_single_user
+from locust_plugins.users.playwright import PageWithRetry, PlaywrightUser, sync
+import locust_plugins.users.playwright as pw_plugin
+from playwright.async_api import async_playwright
 from common.helpers.playwright import *
+from common.helpers.account_pool import AccountPool, load_plan_accounts, account_plan_ids
+from common.helpers.context_pool import pooled_pw
+from common.helpers.interception import launch_density_browser, interception_summary
+from common.helpers.coordination import Coordinator
+from common.helpers import metrics
+from common.helpers.metrics import fire_metric
+from common.helpers.profile_cache import profile_cache
+from common.helpers.recorder import SessionRecorder, compile_scenario, save_scenario
+from common.helpers.scenario import ScenarioEngine, load_scenario
+from common.helpers.arrivals import ArrivalScheduler
+from common.helpers.shards import ShardAssigner, load_shard_manifest
+from common.helpers.results_sink import ResultsSink
+from common.helpers.network import network_telemetry
+from common.helpers.ws_telemetry import ws_telemetry
+from common.helpers.client_errors import install_error_sentinel
+from common.helpers.captures import capture_recorder, checked_action
+from common.helpers.collab import (
+    install_collab_observer,
+    arm_collab_observer,
+    concurrency_bucket,
+)
+from common.helpers.logs import get_logger, setup_logging, log_stats
 from config import *
 
+logger = get_logger("locustfile")
+user_logger = get_logger("user")  # ✅ Onebrief.log, the chattiest category
+
 SUPERVISOR_COOKIES_FILE = "supervisor_cookies.json"
 
-# Configure logging
-logging.basicConfig(
-    filename="load_test.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+# Configure logging (queued, written off the event loop)
+setup_logging("load_test.log")
 
 # **Global Variables for Shared Supervisor Data**
 shared_plan_url = None
 shared_order_url = None
 supervisor_cookies = None
-supervisor_page = None  # ✅ Persistent supervisor page
+coordinator = None  # ✅ Setup data, user registry and plan linking across processes
+account_pool = AccountPool([])  # ✅ Accounts pre-registered by setup.py
 setup_complete = asyncio.Event()  # ✅ Blocks tasks until setup is complete
+scenario_recorded = False  # ✅ Only the first session is saved in RECORD_SESSION mode
+scenario_engine = None  # ✅ The workload mix, loaded from SCENARIO_FILE on init
+arrivals = None  # ✅ Session arrivals in open-workload mode (ARRIVAL_RATE > 0)
+shard_assigner = None  # ✅ Spreads users over the plans in the shard manifest
+results_sink = None  # ✅ Per-sample results of the running test (RESULTS_SINK)
+
+
+@events.init.add_listener
+def register_metrics_environment(environment, **kwargs):
+    """Lets the helpers report custom metrics to this environment."""
+    metrics.set_environment(environment)
+
+
+@events.init.add_listener
+def load_workload_scenario(environment, **kwargs):
+    """Loads and validates the scenario file, so a bad mix fails before any user starts."""
+    global scenario_engine
+    scenario_engine = ScenarioEngine(load_scenario())
+
+
+@events.init.add_listener
+def start_coordinator(environment, **kwargs):
+    """Shares setup data, the user registry and plan linking across processes."""
+    global coordinator
+    coordinator = Coordinator(environment)
+    coordinator.on_setup_data = apply_setup_data
+
+
+def apply_setup_data(data):
+    """Stores the setup data (read from file, or sent by the master)."""
+    global shared_plan_url, shared_order_url, supervisor_cookies, account_pool, arrivals
+    global shard_assigner
+
+    shared_plan_url = data["shared_plan_url"]
+    shared_order_url = data["shared_order_url"]
+    supervisor_cookies = data["auth_cookies"]
+    account_pool = AccountPool(data["accounts"])
+    shard_assigner = ShardAssigner(data["shards"])
+
+    logger.info(f"✅ Supervisor setup loaded: {shared_plan_url}")
+    logger.info(f"🏊 {len(account_pool)} pooled accounts available")
+    logger.info(f"🧩 {len(data['shards'])} plan shards ({SHARD_POLICY})")
+    if ARRIVAL_RATE:
+        # ✅ Each worker generates its share of the total arrival rate
+        arrivals = ArrivalScheduler(ARRIVAL_RATE * data.get("worker_share", 1))
+    setup_complete.set()  # ✅ Unblocks tasks that depend on this data
+
+
+def read_setup_data():
+    """Reads the supervisor data, shards and pooled accounts written by setup."""
+    with open(SUPERVISOR_COOKIES_FILE, "r") as f:
+        data = json.load(f)
+
+    # ✅ Without a manifest (older setup) the shared plan is the only shard
+    data["shards"] = load_shard_manifest() or [
+        {
+            "index": 0,
+            "plan_url": data["shared_plan_url"],
+            "plan_id": get_plan_id_from_url(data["shared_plan_url"]),
+            "order_url": data["shared_order_url"],
+        }
+    ]
+    return data, load_plan_accounts(data["shared_plan_url"])
+
+
+async def run_setup_and_publish(environment):
+    """Runs setup on the Playwright loop, then hands its data to the users."""
+    from setup import supervisor_setup  # ✅ Imported late, so it can't configure logging
+
+    try:
+        await supervisor_setup()
+        coordinator.publish_setup_data(*read_setup_data())
+    except Exception as e:
+        logger.error(f"❌ Setup failed: {e}")
+        gevent.spawn(environment.runner.quit)
 
 
 @events.test_start.add_listener
 def load_supervisor_data(environment, **kwargs):
     """Reads supervisor cookies & URLs from file before Locust users start."""
-    global shared_plan_url, shared_order_url, supervisor_cookies
+    # A new test run gets a new event loop, so the linker is started again
+    coordinator.reset()
 
-    logging.info("🔍 Loading supervisor setup data from JSON...")
-    try:
-        with open(SUPERVISOR_COOKIES_FILE, "r") as f:
-            data = json.load(f)
+    if coordinator.is_worker:
+        return  # ✅ The master sends the run id and the setup data
+    coordinator.start_run()
 
-        shared_plan_url = data["shared_plan_url"]
-        shared_order_url = data["shared_order_url"]
-        supervisor_cookies = data["auth_cookies"]
+    if SETUP_ON_TEST_START:
+        # ✅ Users wait on setup_complete, so setup doesn't need to block the start
+        logger.info("🔧 Running supervisor setup...")
+        asyncio.run_coroutine_threadsafe(run_setup_and_publish(environment), pw_plugin.loop)
+        return
 
-        logging.info(f"✅ Supervisor setup loaded: {shared_plan_url}")
-        setup_complete.set()  # ✅ Unblocks tasks that depend on this data
+    logger.info("🔍 Loading supervisor setup data from JSON...")
+    try:
+        coordinator.publish_setup_data(*read_setup_data())
 
     except Exception as e:
-        logging.error(f"❌ Failed to load supervisor setup: {e}")
+        logger.error(f"❌ Failed to load supervisor setup: {e}")
         raise SystemExit("Exiting due to missing supervisor setup.")
 
 
+@events.test_start.add_listener
+def start_results_sink(environment, **kwargs):
+    """Streams every sample of this run to a SQLite file for report.py."""
+    global results_sink
+    if RESULTS_SINK and not coordinator.is_master:  # ✅ Only workers see the samples
+        results_sink = ResultsSink.for_run(environment, coordinator.run_id)
+        results_sink.start()
+
+
+@events.test_start.add_listener
+def start_network_telemetry(environment, **kwargs):
+    """Flushes the per-URL request aggregates to Locust on an interval."""
+    if NETWORK_TELEMETRY:
+        network_telemetry.start()
+
+
+@events.test_stop.add_listener
+def stop_network_telemetry(environment, **kwargs):
+    """Reports the last requests and logs the status classes seen."""
+    if NETWORK_TELEMETRY:
+        network_telemetry.stop()
+        logger.info(network_telemetry.summary())
+
+
+@events.test_start.add_listener
+def start_ws_telemetry(environment, **kwargs):
+    """Flushes the websocket rates (gauges) and round trips on an interval."""
+    if WS_TELEMETRY:
+        ws_telemetry.start()
+
+
+@events.test_stop.add_listener
+def stop_ws_telemetry(environment, **kwargs):
+    """Reports the last websocket counts and logs how many sockets were opened."""
+    if WS_TELEMETRY:
+        ws_telemetry.stop()
+        logger.info(ws_telemetry.summary())
+
+
+@events.test_stop.add_listener
+def stop_results_sink(environment, **kwargs):
+    """Writes the remaining samples and closes the results file.
+
+    Registered after the telemetry listeners, so their last flush is stored too.
+    """
+    global results_sink
+    if results_sink:
+        results_sink.stop()
+        results_sink = None
+
+
+@events.test_stop.add_listener
+def close_plan_linker(environment, **kwargs):
+    """Stops the linker's Playwright driver and API session; the next run starts a new one."""
+    if coordinator:
+        coordinator.close_linker()
+
+
+@events.quitting.add_listener
+def close_plan_linker_on_quit(environment, **kwargs):
+    """Also on quit, in case the run never reached test_stop."""
+    if coordinator:
+        coordinator.close_linker()
+
+
+@events.test_stop.add_listener
+def report_captures(environment, **kwargs):
+    """Logs how many failure captures were saved or skipped over the quota."""
+    if CAPTURE_MODE != "off":
+        logger.info(capture_recorder.summary())
+
+
+@events.test_stop.add_listener
+def report_profile_cache(environment, **kwargs):
+    """Logs how many profile lookups were served without a request."""
+    stats = profile_cache.stats()
+    logger.info(
+        f"📇 Profile cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"({stats['hit_rate']:.0%} hit rate)"
+    )
+
+
+@events.test_stop.add_listener
+def report_scenario_mix(environment, **kwargs):
+    """Logs the achieved action mix against the scenario's weights."""
+    for line in scenario_engine.mix_report():
+        logger.info(line)
+
+
+@events.test_stop.add_listener
+def stop_arrivals(environment, **kwargs):
+    """Stops generating arrivals and logs how many were dropped."""
+    if arrivals:
+        arrivals.stop()
+        logger.info(arrivals.summary())
+
+
+@events.test_stop.add_listener
+def report_shards(environment, **kwargs):
+    """Logs how many users each plan shard got."""
+    if shard_assigner:
+        for line in shard_assigner.summary():
+            logger.info(line)
+
+
+@events.test_stop.add_listener
+def report_logging(environment, **kwargs):
+    """Logs how many log lines were dropped or sampled out."""
+    stats = log_stats()
+    logger.info(
+        f"📝 Logging: {stats['dropped']} lines dropped (queue full), "
+        f"{stats['sampled_out']} sampled out"
+    )
+
+
+@events.test_stop.add_listener
+def report_interception(environment, **kwargs):
+    """Logs how many requests each interception profile blocked."""
+    for line in interception_summary():
+        logger.info(line)
+
+
 class Onebrief(PlaywrightUser):
     """Main Locust user class that simulates registered users."""
 
-    wait_time = between(5, 10)
+    # ✅ In open-workload mode the arrival schedule paces sessions, not the users
+    wait_time = constant(0) if ARRIVAL_RATE else between(5, 10)
     host = HOST_URL
+    account = None  # ✅ Kept for the virtual user's lifetime, like its warm context
+    registration = None  # ✅ Ordinal and counts from the global user registry
+    concurrent_users = 0  # ✅ Last known count, used to bucket collaboration latency
+    shard = None  # ✅ The plan and order this user works in, kept for its lifetime
 
     def __init__(self, environment):
         super().__init__(environment)
@@ -61,43 +293,44 @@ class Onebrief(PlaywrightUser):
                 "shared_plan_url": shared_plan_url,
                 "shared_order_url": shared_order_url,
                 "supervisor_cookies": supervisor_cookies,
-                "pages": [],
-                "registered_users": [],
+                "pages": weakref.WeakSet(),  # ✅ Open pages only, closed ones drop out
             }
 
-    async def handle_page_errors(self, page):
-        """Attaches error handlers to the given Playwright page."""
-
-        # ✅ Detect failed requests
-        page.on(
-            "requestfailed",
-            lambda request: self.log(f"❌ Request failed: {request.url}"),
-        )
-
-        # ✅ Detect HTTP 400+ responses
-        async def check_response(response):
-            if response.status >= 400:
-                self.log(f"🚨 HTTP {response.status} on {response.url}")
-                await self.handle_error(response.url, response.status)
-
-        page.on("response", check_response)
-
-    async def handle_error(self, url, status):
-        """Handles detected errors by logging and taking necessary actions."""
-        self.log(f"🔥 Detected issue! {status} response from {url}")
-        # ✅ Add any recovery steps here (e.g., reload page, retry request, etc.)
-
-    async def check_page_for_oops(self, page):
-        """Checks if 'Oops' appears anywhere in the page."""
-        try:
-            await expect(page.locator("body")).not_to_contain_text("Oops", timeout=5000)
-        except Exception:
-            self.log(f"⚠️ 'Oops' detected on {page.url}")
-            await self.handle_error(page.url, "Oops")
+    async def _pwprep(self):
+        """Starts Playwright and a Chromium launched with the density flags."""
+        if self.playwright is None:
+            self.playwright = await async_playwright().start()
+        if self.browser is None:
+            headless = self.headless or (
+                self.headless is None and self.environment.runner is not None
+            )
+            self.browser = await launch_density_browser(self.playwright, headless)
+
+    async def setup_context(self, context):
+        """Prepares every new browser context of this user."""
+        if NETWORK_TELEMETRY:
+            network_telemetry.attach(context)  # ✅ Requests per URL template, failures included
+        if WS_TELEMETRY:
+            # ✅ Realtime channel traffic, fan-out bucketed by this user's last known user count
+            ws_telemetry.attach(context, lambda: self.concurrent_users)
+        if CLIENT_ERRORS:
+            await install_error_sentinel(context)  # ✅ JS errors and error boundaries, drained per action
+        await capture_recorder.attach(context)  # ✅ Trace chunks, kept only for failed or slow actions
+        if COLLAB_LATENCY:
+            await install_collab_observer(context, self.on_collab_token_seen)
+
+    def on_collab_token_seen(self, author_id, sent_ms, seen_ms):
+        """Reports how long another user's edit took to show up in this page."""
+        if not self.account or author_id == self.account["user_data"]["id"]:
+            return  # ✅ Our own edits appear instantly
+        latency = seen_ms - sent_ms
+        if latency > COLLAB_MAX_LATENCY:
+            return
+        bucket = concurrency_bucket(self.concurrent_users, COLLAB_USER_BUCKET)
+        fire_metric("COLLAB", f"edit propagation ({bucket})", max(latency, 0))
 
     def log(self, msg):
-        print(msg)
-        logging.info(msg)
+        user_logger.info(msg)
 
     def get_shared_plan_url(self):
         return self.environment.shared_data["shared_plan_url"]
@@ -109,58 +342,88 @@ class Onebrief(PlaywrightUser):
         """Resize the browser window to a specific size."""
         await page.set_viewport_size({"width": 1400, "height": 800})
 
-    async def get_supervisor_page(self):
-        """Creates or retrieves a persistent Playwright page for the supervisor."""
-        self.log("🔍 Retrieving supervisor page...")
-        global supervisor_page
-
-        if supervisor_page is None:
-            self.log("🆕 Creating a persistent supervisor page...")
-            context = await self.browser.new_context()
-            supervisor_page = await context.new_page()
-            await supervisor_page.context.add_cookies(supervisor_cookies)
-            self.log("✅ Supervisor page initialized with stored cookies.")
-            # Resize
-            await self.resize_browser(supervisor_page)
-        return supervisor_page
-
-    def get_total_concurrent_user_count(self):
-        """Get the total number of concurrent users."""
-        count = len(self.environment.shared_data["registered_users"])
+    async def register_active_user(self, u):
+        """Adds the user to the global registry, once per virtual user."""
+        if self.registration is None:
+            self.registration = await coordinator.register_user(u["user_data"]["id"])
+
+    async def get_total_concurrent_user_count(self):
+        """Get the total number of concurrent users (across all workers)."""
+        count = (await coordinator.user_counts())["active"]
+        self.concurrent_users = count
         self.log(f"❤️ Total concurrent users: {count}")
         return count
 
+    def track_page(self, page):
+        """Keeps the open page in shared_data until it closes."""
+        pages = self.environment.shared_data["pages"]
+        if page not in pages:
+            pages.add(page)
+            page.once("close", lambda p: pages.discard(p))
+
+    def context(self):
+        """Tags this user's request events with its ordinal, shard and the user count it last saw."""
+        return {
+            "user_ordinal": self.registration["ordinal"] if self.registration else None,
+            "shard": self.shard["index"] if self.shard else None,
+            "concurrent_users": self.concurrent_users,
+        }
+
     def get_creation_order(self, u):
-        """Get the index # of the user in the registered_users list."""
-        try:
-            return self.environment.shared_data["registered_users"].index(u) + 1
-        except ValueError:
+        """Get the global creation ordinal of the user."""
+        if self.registration is None:
             return -1
+        return self.registration["ordinal"]
+
+    async def checkout_account(self, page):
+        """Loads a pooled account into the page, falling back to UI registration."""
+        account = account_pool.checkout()
+        if account:
+            await page.context.add_cookies(account["storage_state"]["cookies"])
+            # The pooled profile is already known, no need to ask the server
+            profile_cache.set(page.context, account["user_data"])
+            self.log(f"🏊 Checked out pooled account {account['username']}")
+            return account
+
+        self.log("🆕 Account pool exhausted, registering through the UI...")
+        return await register_user(page)
+
+    async def join_shard(self, u):
+        """Registers the user, picks its shard and links it to the shard's plan if needed."""
+        await self.register_active_user(u)
+        if self.shard is None:
+            self.shard = shard_assigner.assign(self.get_creation_order(u))
+        if self.shard["plan_id"] not in account_plan_ids(u):
+            await self.link_user_to_shared_plan(u["user_data"]["id"])
+            u["plan_ids"] = account_plan_ids(u) + [self.shard["plan_id"]]
 
-    # @pw
     async def link_user_to_shared_plan(self, user_id: int):
-        """Links the registered user to the shared plan."""
-        supervisor_page = await self.get_supervisor_page()
-        self.log(f"🔗 Linking user {user_id} to the shared plan...")
-
-        # Navigate to the shared plan management page
-        await supervisor_page.goto(shared_plan_url)
-        await wait_for_page_to_fully_load(supervisor_page)
-
-        # Perform linking operation (Replace with actual logic)
-        plan_id = get_plan_id_from_url(shared_plan_url)
-        await link_user_to_plan_api(supervisor_page, user_id, plan_id)
-
-        self.log(f"✅ User {user_id} linked successfully to Plan {plan_id}.")
+        """Links the registered user to its shard's plan."""
+        self.log(f"🔗 Linking user {user_id} to plan {self.shard['plan_id']}...")
+        await coordinator.link_user(user_id, self.shard["plan_id"])
+        self.log(f"✅ User {user_id} linked successfully to plan {self.shard['plan_id']}.")
+
+    @sync
+    async def on_stop(self):
+        """Closes the warm context and returns the account to the pool."""
+        if getattr(self, "context_pool", None):
+            await self.context_pool.close()
+        if self.registration:
+            coordinator.unregister_user(self.account["user_data"]["id"])
+            self.registration = None
+        if self.account and "storage_state" in self.account:
+            account_pool.checkin(self.account)
+        self.account = None
 
     @task
-    @pw
+    @pooled_pw
     async def register_account(self, page: PageWithRetry):
         """Register for an account and interact with the shared plan."""
         await setup_complete.wait()  # ✅ Ensure supervisor setup is ready
 
         # Resize
-        await self.resize_browser(page)
+        if not self.context_pool.warm:
+            await self.resize_browser(page)
 
         self.log("🧨" * 5)
         self.log(self.get_shared_plan_url())
@@ -168,72 +431,107 @@ class Onebrief(PlaywrightUser):
 
         self.log("✅ Onebrief user proceeding!!!")
 
-        async with event(self, "Register new user"):
-            u = await register_user(page)
-            if not u:
-                logging.error(
-                    "❌ Failed to register user: register_user() returned None"
+        # ✅ Open workload: wait for the next arrival and time the session from it
+        async with arrivals.session() if arrivals else nullcontext():
+            # ✅ Not the plugin's `event`: it swallows errors, so pooled_pw would never
+            # recycle a failed context nor the arrival count the session as failed
+            start = time.perf_counter()
+            exception = None
+            try:
+                # The warm context (or the storage state it was recycled with) is
+                # still logged in, so only the first iteration needs an account
+                u = self.account or await self.checkout_account(page)
+                if not u:
+                    logger.error(
+                        "❌ Failed to register user: register_user() returned None"
+                    )
+                    return
+
+                if "id" not in u["user_data"]:
+                    logger.error(f"❌ Invalid user object: {u}")
+                    return
+
+                self.account = u
+                await self.join_shard(u)
+                await self.run_shared_order_session(page, u)
+            except Exception as e:
+                exception = e
+                raise
+            finally:
+                fire_metric(
+                    "event",
+                    "Register new user",
+                    (time.perf_counter() - start) * 1000,
+                    exception=exception,
                 )
-                return
-
-            if "id" not in u["user_data"]:
-                logging.error(f"❌ Invalid user object: {u}")
-                return
-
-            if u:
-                self.log("✅ Registered successfully.")
-
-                # Store the user & page object
-                self.environment.shared_data["registered_users"].append(u)
-                self.environment.shared_data["pages"].append(page)
-
-                user_id = u["user_data"]["id"]
-
-                self.log("-----------------")
-                self.log(u)
-                self.log("-----------------")
-                self.log("☝🏽 Attempting to link {user_id}")
-
-                # Now link this user to the shared plan
-                await self.link_user_to_shared_plan(user_id)
-
-                # Now the user is linked to the shared plan
-                self.log(f"🚀 Navigating to shared plan: {shared_plan_url}")
-                await page.goto(shared_order_url, timeout=60000)
-                self.log(f"\t - Waiting for shared plan url to load...")
-                await wait_for_page_to_fully_load(page)
-                self.log(f"\t - Loaded!!!")
-
-                # If the creation_order is a multiple of 5, retitle the page
-                creation_order = self.get_creation_order(u)
-                count = self.get_total_concurrent_user_count()
-                if creation_order % 5 == 0:
-                    await title_page(page, f"Shared Order [{count}] Concurrent Users")
 
-                # Create a dict of function references
-                async def f1():
-                    for i in range(5):
-                        await edit_order(page)
-
-                async def f2():
-                    await create_cards_in_card_library(page, rand_between(1, 4))
-
-                async def f3():
-                    await create_random_artifact(page)
-                    await page.goto(shared_order_url)
-                    await wait_for_page_to_fully_load(page)
-
-                async def f4():
-                    await title_page(page, f"Shared Order [{count}] Concurrent Users")
-
-                funcs = [f1, f2, f3]
-
-                for i in range(10):
-                    # Do 1 random thing...
-                    await funcs[rand_between(0, 2)]()
+    def save_recorded_scenario(self, recorder: SessionRecorder, u: dict):
+        """Compiles the recorded session into a replay scenario."""
+        global scenario_recorded
+
+        scenario = compile_scenario(
+            recorder.steps,
+            {
+                "user_id": u["user_data"]["id"],
+                "plan_id": self.shard["plan_id"],
+                "order_id": get_plan_id_from_url(self.shard["order_url"]),
+                "username": u["username"],
+                "email": u["email"],
+            },
+        )
+        save_scenario(scenario)
+        scenario_recorded = True
+
+    async def run_shared_order_session(self, page: PageWithRetry, u: dict):
+        """Joins the shared order as the given (already linked) user and works in it."""
+        self.log("✅ Registered successfully.")
+        recorder = None
+        if RECORD_SESSION and not scenario_recorded:
+            recorder = SessionRecorder(page)
+
+        # Register the user & store the page object
+        await self.register_active_user(u)
+        self.track_page(page)
+
+        user_id = u["user_data"]["id"]
+
+        self.log(f"👤 {u['username']} (id {user_id})")
+
+        # The user is linked to its shard's plan (by setup.py or join_shard)
+        order_url = self.shard["order_url"]
+        shard_name = f"shard {self.shard['index']}"
+        self.log(f"🚀 Navigating to shared plan: {self.shard['plan_url']}")
+        session_start = start = time.perf_counter()
+        async with checked_action(page, "join shared order"):
+            await page.goto(order_url, timeout=60000)
+            self.log(f"\t - Waiting for shared plan url to load...")
+            await wait_for_page_to_fully_load(page)
+        self.log(f"\t - Loaded!!!")
+        start_kind = "warm" if self.context_pool.warm else "cold"
+        fire_metric(
+            "NAV",
+            f"shared order ({start_kind} start)",
+            (time.perf_counter() - start) * 1000,
+        )
+        fire_metric("SHARD", f"{shard_name} join", (time.perf_counter() - start) * 1000)
+        if COLLAB_LATENCY:
+            await arm_collab_observer(page)
+
+        # If the creation_order is a multiple of 5, retitle the page
+        creation_order = self.get_creation_order(u)
+        count = await self.get_total_concurrent_user_count()
+        if creation_order % 5 == 0:
+            await title_page(page, f"Shared Order [{count}] Concurrent Users")
+
+        # Work in the order as described by the scenario file
+        await scenario_engine.run(
+            page,
+            {"shared_order_url": order_url, "concurrent_users": count},
+        )
+        fire_metric("SHARD", f"{shard_name} session", (time.perf_counter() - session_start) * 1000)
 
-                # Screenshot
-                await page.screenshot(path=f"shared-order-{user_id}.png")
+        if recorder and not scenario_recorded:
+            self.save_recorded_scenario(recorder, u)
 
 
 if __name__ == "__main__":
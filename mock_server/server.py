@@ -0,0 +1,318 @@
+import re
+import random
+import secrets
+import logging
+import argparse
+import itertools
+from pathlib import Path
+import gevent
+from gevent.event import Event
+from gevent.pywsgi import WSGIServer
+from flask import Flask, jsonify, request, send_from_directory
+
+STATIC_DIR = Path(__file__).parent / "static"
+SESSION_COOKIE = "session"
+LONG_POLL_TIMEOUT = 10  # Seconds a /changes request waits for a new version
+
+# Every new document starts with a few paragraphs for edit_order to pick from
+SEED_PARAGRAPHS = [
+    "1. SITUATION. Enemy forces are consolidating along the northern corridor.",
+    "2. MISSION. Task force secures the crossing sites no later than D+1.",
+    "3. EXECUTION. Main effort advances in two phases along axis BLUE.",
+    "4. SUSTAINMENT. Resupply points are established at each phase line.",
+    "5. COMMAND AND SIGNAL. Primary net is FM, alternate is SATCOM.",
+]
+
+
+class Latency:
+    """Injected server-side latency for /api routes: base + random jitter,
+    or a fixed value for the routes that match an override pattern."""
+
+    def __init__(self, base_ms: int = 0, jitter_ms: int = 0, routes: dict = None):
+        self.base_ms = base_ms
+        self.jitter_ms = jitter_ms
+        self.routes = [(re.compile(p), ms) for p, ms in (routes or {}).items()]
+
+    def delay_ms(self, path: str) -> float:
+        for pattern, ms in self.routes:
+            if pattern.search(path):
+                return ms
+        return self.base_ms + random.uniform(0, self.jitter_ms)
+
+
+class MockState:
+    """Everything the mock app knows, in memory. Lost on restart."""
+
+    def __init__(self):
+        self.ids = itertools.count(1000)
+        self.users = {}  # id -> user
+        self.usernames = {}  # username -> id
+        self.sessions = {}  # token -> user id
+        self.plans = {}  # id -> {"name", "members", "artifacts"}
+        self.artifacts = {}  # id -> {"plan_id", "type", "title", "paragraphs", "version"}
+        self.cards = {}  # plan id -> [text]
+        self.changed = {}  # artifact id -> Event, set on every change
+
+    def create_user(self, fields: dict) -> dict:
+        user_id = next(self.ids)
+        first, last = fields.get("first-name", ""), fields.get("last-name", "")
+        user = {
+            "id": user_id,
+            "username": fields["username"],
+            "email": fields.get("email", f"{fields['username']}@example.com"),
+            "name": f"{first} {last}".strip() or fields["username"],
+            "password": fields.get("password", ""),
+        }
+        self.users[user_id] = user
+        self.usernames[user["username"]] = user_id
+        return user
+
+    def start_session(self, user_id: int) -> str:
+        token = secrets.token_hex(16)
+        self.sessions[token] = user_id
+        return token
+
+    def notify(self, artifact_id: int):
+        event = self.changed.pop(artifact_id, None)
+        if event:
+            event.set()
+
+
+def public_user(user: dict) -> dict:
+    return {k: v for k, v in user.items() if k != "password"}
+
+
+def create_app(latency: Latency = None) -> Flask:
+    latency = latency or Latency()
+    state = MockState()
+    app = Flask(__name__, static_folder=None)
+
+    def error(status: int, message: str):
+        return jsonify({"error": message}), status
+
+    def current_user():
+        user_id = state.sessions.get(request.cookies.get(SESSION_COOKIE))
+        return state.users.get(user_id)
+
+    def logged_in(response, user: dict):
+        token = state.start_session(user["id"])
+        response.set_cookie(SESSION_COOKIE, token, httponly=True, samesite="Lax")
+        return response
+
+    def plan_for(plan_id: int, user: dict):
+        plan = state.plans.get(plan_id)
+        if plan is None:
+            return None, error(404, "Plan not found")
+        if user["id"] not in plan["members"]:
+            return None, error(403, "Not a member of this plan")
+        return plan, None
+
+    @app.before_request
+    def inject_latency():
+        if request.path.startswith("/api/") and not request.path.endswith("/changes"):
+            delay = latency.delay_ms(request.path)
+            if delay > 0:
+                gevent.sleep(delay / 1000)
+
+    @app.before_request
+    def require_login():
+        public = ("/api/auth/login", "/api/auth/register")
+        if request.path.startswith("/api/") and request.path not in public:
+            if current_user() is None:
+                return error(401, "Not logged in")
+
+    # Auth
+
+    @app.post("/api/auth/login")
+    def login():
+        body = request.get_json(force=True)
+        user_id = state.usernames.get(body.get("username"))
+        if user_id is None:
+            # Unknown usernames (e.g. the supervisor) are signed up on the spot
+            user = state.create_user(body)
+        else:
+            user = state.users[user_id]
+            if user["password"] != body.get("password"):
+                return error(401, "Wrong username or password")
+        return logged_in(jsonify(public_user(user)), user)
+
+    @app.post("/api/auth/register")
+    def register():
+        body = request.get_json(force=True)
+        if body.get("username") in state.usernames:
+            return error(409, "Username taken")
+        user = state.create_user(body)
+        return logged_in(jsonify(public_user(user)), user)
+
+    @app.get("/api/auth/profile")
+    def profile():
+        return jsonify(public_user(current_user()))
+
+    # Plans
+
+    @app.post("/api/plans")
+    def create_plan():
+        user = current_user()
+        plan_id = next(state.ids)
+        state.plans[plan_id] = {
+            "name": request.get_json(force=True).get("name", "Untitled plan"),
+            "members": {user["id"]},
+            "artifacts": [],
+        }
+        state.cards[plan_id] = []
+        return jsonify({"id": plan_id})
+
+    @app.get("/api/plans/<int:plan_id>")
+    def get_plan(plan_id):
+        plan, failure = plan_for(plan_id, current_user())
+        if failure:
+            return failure
+        artifacts = [
+            {"id": a, "title": state.artifacts[a]["title"], "type": state.artifacts[a]["type"]}
+            for a in plan["artifacts"]
+        ]
+        members = [public_user(state.users[m]) for m in sorted(plan["members"])]
+        return jsonify({"id": plan_id, "name": plan["name"], "artifacts": artifacts, "members": members})
+
+    @app.put("/api/brief/<int:plan_id>/access/user/<int:user_id>/editor")
+    def link_user(plan_id, user_id):
+        plan, failure = plan_for(plan_id, current_user())
+        if failure:
+            return failure
+        if user_id not in state.users:
+            return error(404, "User not found")
+        plan["members"].add(user_id)
+        return "", 200
+
+    # Artifacts
+
+    @app.post("/api/plans/<int:plan_id>/artifacts")
+    def create_artifact(plan_id):
+        plan, failure = plan_for(plan_id, current_user())
+        if failure:
+            return failure
+        body = request.get_json(force=True)
+        artifact_id = next(state.ids)
+        state.artifacts[artifact_id] = {
+            "plan_id": plan_id,
+            "type": body.get("type", "Document"),
+            "title": body.get("title") or "Untitled",
+            "paragraphs": list(SEED_PARAGRAPHS),
+            "version": 1,
+        }
+        plan["artifacts"].append(artifact_id)
+        return jsonify({"id": artifact_id})
+
+    def artifact_for(artifact_id: int):
+        artifact = state.artifacts.get(artifact_id)
+        if artifact is None:
+            return None, error(404, "Artifact not found")
+        _, failure = plan_for(artifact["plan_id"], current_user())
+        return artifact, failure
+
+    def artifact_json(artifact_id: int, artifact: dict):
+        return jsonify({"id": artifact_id, **artifact})
+
+    @app.get("/api/artifacts/<int:artifact_id>")
+    def get_artifact(artifact_id):
+        artifact, failure = artifact_for(artifact_id)
+        return failure or artifact_json(artifact_id, artifact)
+
+    @app.put("/api/artifacts/<int:artifact_id>/title")
+    def set_title(artifact_id):
+        artifact, failure = artifact_for(artifact_id)
+        if failure:
+            return failure
+        artifact["title"] = request.get_json(force=True)["title"]
+        artifact["version"] += 1
+        state.notify(artifact_id)
+        return artifact_json(artifact_id, artifact)
+
+    @app.post("/api/artifacts/<int:artifact_id>/splice")
+    def splice_paragraphs(artifact_id):
+        """Replaces `delete` paragraphs at `index` with `insert`, like Array.splice"""
+        artifact, failure = artifact_for(artifact_id)
+        if failure:
+            return failure
+        body = request.get_json(force=True)
+        index = min(body["index"], len(artifact["paragraphs"]))
+        artifact["paragraphs"][index : index + body["delete"]] = body["insert"]
+        artifact["version"] += 1
+        state.notify(artifact_id)
+        return artifact_json(artifact_id, artifact)
+
+    @app.get("/api/artifacts/<int:artifact_id>/changes")
+    def wait_for_changes(artifact_id):
+        """Long poll: answers once the artifact is newer than `since`"""
+        artifact, failure = artifact_for(artifact_id)
+        if failure:
+            return failure
+        since = request.args.get("since", type=int, default=0)
+        if artifact["version"] <= since:
+            event = state.changed.setdefault(artifact_id, Event())
+            event.wait(LONG_POLL_TIMEOUT)
+        return artifact_json(artifact_id, artifact)
+
+    # Card library
+
+    @app.get("/api/plans/<int:plan_id>/cards")
+    def get_cards(plan_id):
+        _, failure = plan_for(plan_id, current_user())
+        return failure or jsonify(state.cards[plan_id])
+
+    @app.post("/api/plans/<int:plan_id>/cards")
+    def create_card(plan_id):
+        _, failure = plan_for(plan_id, current_user())
+        if failure:
+            return failure
+        state.cards[plan_id].append(request.get_json(force=True)["text"])
+        return jsonify({"count": len(state.cards[plan_id])})
+
+    # The single-page app handles every other path
+
+    @app.get("/static/<path:filename>")
+    def static_files(filename):
+        return send_from_directory(STATIC_DIR, filename)
+
+    @app.get("/")
+    @app.get("/<path:path>")
+    def index(path=""):
+        if path.startswith("api/"):
+            return error(404, "Not found")
+        return send_from_directory(STATIC_DIR, "index.html")
+
+    return app
+
+
+def parse_route_latency(values: list[str]) -> dict:
+    """'PATTERN=MS' pairs, e.g. '/api/auth/profile=250'"""
+    routes = {}
+    for value in values or []:
+        pattern, _, ms = value.rpartition("=")
+        routes[pattern] = float(ms)
+    return routes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Onebrief app")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0, help="Base /api latency in ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Random extra /api latency in ms")
+    parser.add_argument(
+        "--route-latency",
+        action="append",
+        metavar="PATTERN=MS",
+        help="Fixed latency for /api paths matching PATTERN (repeatable)",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    latency = Latency(args.latency, args.jitter, parse_route_latency(args.route_latency))
+    app = create_app(latency)
+    logging.info(f"🧪 Mock Onebrief listening on http://{args.host}:{args.port}")
+    WSGIServer((args.host, args.port), app, log=None).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+// Stand-in for the Onebrief web app. It implements only the data-testids and
+// flows used by common/helpers/playwright.py. Every page change is a full
+// navigation, so each page goes through the spinner -> avatar readiness cycle.
+
+const root = document.getElementById("root");
+
+async function api(method, path, body) {
+  const options = { method, credentials: "same-origin", headers: {} };
+  if (body !== undefined) {
+    options.headers["Content-Type"] = "application/json";
+    options.body = JSON.stringify(body);
+  }
+  const response = await fetch(path, options);
+  const text = await response.text();
+  if (!response.ok) {
+    const error = new Error(`HTTP ${response.status} on ${path}`);
+    error.status = response.status;
+    throw error;
+  }
+  return text ? JSON.parse(text) : null;
+}
+
+// h("div", { testid: "x", onclick: fn }, child, ...) -> element
+function h(tag, attrs = {}, ...children) {
+  const el = document.createElement(tag);
+  for (const [key, value] of Object.entries(attrs)) {
+    if (value === false || value === undefined || value === null) continue;
+    if (key.startsWith("on")) el.addEventListener(key.slice(2), value);
+    else if (key === "testid") el.dataset.testid = value;
+    else el.setAttribute(key, value === true ? "" : value);
+  }
+  el.append(...children.flat());
+  return el;
+}
+
+// ProseMirror marks its focused editor with this class; the helpers look for it
+document.addEventListener("focusin", (e) => {
+  if (e.target.isContentEditable) e.target.classList.add("ProseMirror-focused");
+});
+document.addEventListener("focusout", (e) => {
+  if (e.target.classList) e.target.classList.remove("ProseMirror-focused");
+});
+
+// Menus close on any click outside of them
+let openMenu = null;
+function showMenu(anchor, items) {
+  closeMenu();
+  const rect = anchor.getBoundingClientRect();
+  openMenu = h("div", { class: "menu", role: "menu", style: `top:${rect.bottom}px;left:${rect.left}px` }, items);
+  document.body.append(openMenu);
+}
+function closeMenu() {
+  if (openMenu) openMenu.remove();
+  openMenu = null;
+}
+document.addEventListener("mousedown", (e) => {
+  if (openMenu && !openMenu.contains(e.target)) closeMenu();
+}, true);
+
+function menuItem(text, onclick) {
+  return h("div", { role: "menuitem", onclick: () => { closeMenu(); onclick(); } },
+    h("span", { testid: "dropdown-item" }, text));
+}
+
+function dialog(title, ...body) {
+  const el = h("div", { class: "dialog", role: "dialog" },
+    h("h2", { testid: "modal-title" }, title),
+    ...body,
+    h("button", { testid: "modal-dismiss", onclick: () => el.remove() }, h("span", {}, "Dismiss")));
+  document.body.append(el);
+  return el;
+}
+
+function oops(message) {
+  root.replaceChildren(h("div", { class: "main" }, h("h1", {}, "Oops, something went wrong"), h("p", {}, message)));
+}
+
+// Login and registration
+
+const REGISTRATION_FIELDS = [
+  "email", "username", "password", "confirm-password", "first-name", "last-name",
+  "rank", "job-title", "organization", "parent-organization",
+];
+
+function renderLogin() {
+  const username = h("input", { name: "username" });
+  const password = h("input", { name: "password", type: "password" });
+  const loginForm = h("form", {
+    onsubmit: async (e) => {
+      e.preventDefault();
+      await api("POST", "/api/auth/login", { username: username.value, password: password.value });
+      location.assign("/");
+    },
+  },
+    h("label", {}, "Username ", username),
+    h("label", {}, "Password ", password),
+    h("button", { type: "submit" }, "Log in"),
+    h("button", { type: "button", testid: "sign-up", onclick: () => root.replaceChildren(renderRegistration()) }, "Sign up"));
+  root.replaceChildren(h("div", { class: "main" }, loginForm));
+}
+
+function renderRegistration() {
+  const inputs = Object.fromEntries(REGISTRATION_FIELDS.map((field) => [
+    field, h("input", { testid: field, type: field.includes("password") ? "password" : "text" }),
+  ]));
+  const terms = h("input", { type: "checkbox", testid: "terms" });
+  const submit = h("button", { type: "submit", testid: "submit-registration", disabled: true }, "Register");
+  const update = () => {
+    const complete = Object.values(inputs).every((i) => i.value) && terms.checked;
+    submit.disabled = !(complete && inputs.password.value === inputs["confirm-password"].value);
+  };
+  Object.values(inputs).forEach((i) => i.addEventListener("input", update));
+  terms.addEventListener("change", update);
+
+  return h("form", {
+    class: "main",
+    onsubmit: async (e) => {
+      e.preventDefault();
+      const fields = Object.fromEntries(Object.entries(inputs).map(([k, i]) => [k, i.value]));
+      await api("POST", "/api/auth/register", fields);
+      location.assign("/");
+    },
+  },
+    REGISTRATION_FIELDS.map((field) => h("label", {}, `${field} `, inputs[field])),
+    h("label", {}, terms, " I accept the terms"),
+    submit);
+}
+
+// App shell: header with avatar, leftnav with the plan's artifacts
+
+function renderShell(profile, plan, content) {
+  const avatar = h("button", {
+    testid: "btn-user-avatar",
+    onclick: () => showMenu(avatar, [
+      menuItem("Profile", () => dialog("Profile", h("p", {}, `${profile.name} (${profile.username})`))),
+    ]),
+  }, profile.name.slice(0, 2).toUpperCase());
+
+  const header = h("div", { class: "header" }, h("strong", {}, plan ? plan.name : "Onebrief"), h("div", { class: "spacer" }));
+  const leftnav = h("div", { class: "leftnav", testid: "leftnav" });
+
+  if (plan) {
+    const planDropdown = h("button", {
+      testid: "plan-dropdown-button",
+      onclick: () => showMenu(planDropdown, [menuItem("Planning team", () => renderPlanningTeam(plan))]),
+    }, "Plan ▾");
+    const cardLibrary = renderCardLibrary(plan);
+    header.append(planDropdown, h("button", { testid: "btn-card-library", onclick: () => cardLibrary.classList.remove("hidden") }, "Cards"));
+    document.body.append(cardLibrary);
+
+    const getStarted = h("button", {
+      testid: "get-started",
+      onclick: () => showMenu(getStarted, ["Document", "C2", "Cause and effect", "List board", "Map"].map(
+        (type) => menuItem(type, () => renderNewArtifact(plan, type)))),
+    }, "+ New");
+    leftnav.append(getStarted, ...plan.artifacts.map((a) => artifactLink(plan, a)));
+  }
+  header.append(avatar);
+  root.replaceChildren(header, h("div", { class: "layout" }, leftnav, h("div", { class: "main" }, content)));
+}
+
+function artifactLink(plan, artifact) {
+  return h("a", { testid: "artifact-link", title: artifact.title, href: `/plan/${plan.id}/artifact/${artifact.id}` }, artifact.title);
+}
+
+async function refreshLeftnav(plan) {
+  const fresh = await api("GET", `/api/plans/${plan.id}`);
+  const leftnav = document.querySelector('[data-testid="leftnav"]');
+  leftnav.querySelectorAll('[data-testid="artifact-link"]').forEach((a) => a.remove());
+  leftnav.append(...fresh.artifacts.map((a) => artifactLink(plan, a)));
+}
+
+function renderPlanningTeam(plan) {
+  dialog("Planning team", ...plan.members.map((m) => h("div", { testid: "account-details" }, `${m.name} - ${m.email}`)));
+}
+
+function renderNewArtifact(plan, type) {
+  const create = h("button", {
+    testid: "create-new-artifact-button",
+    onclick: async () => {
+      const { id } = await api("POST", `/api/plans/${plan.id}/artifacts`, { type, title: `New ${type}` });
+      location.assign(`/plan/${plan.id}/artifact/${id}`);
+    },
+  }, `Create ${type}`);
+  document.querySelector(".main").replaceChildren(h("div", {}, h("p", {}, `New ${type}`), create));
+}
+
+function renderCardLibrary(plan) {
+  const editable = h("div", { contenteditable: "true", class: "editable" }, h("p", {}, h("br")));
+  const editorBody = h("div", { testid: "editor-body", onclick: () => editable.focus() }, editable);
+  const form = h("form", {
+    testid: "add-card-floating-form",
+    class: "hidden",
+    onsubmit: async (e) => {
+      e.preventDefault();
+      await api("POST", `/api/plans/${plan.id}/cards`, { text: editable.innerText.trim() });
+      editable.replaceChildren(h("p", {}, h("br")));
+    },
+  }, editorBody, h("button", { type: "submit" }, "Add card"));
+
+  const win = h("div", { class: "window hidden", testid: "card-library-window" },
+    h("button", { testid: "close-rfw-card-library-window", onclick: () => win.classList.add("hidden") }, "×"),
+    h("h3", {}, "Card library"),
+    h("button", { testid: "btn-add-card-floating", onclick: () => form.classList.remove("hidden") }, "+"),
+    form);
+  return win;
+}
+
+// Pages
+
+async function renderNewPlan(profile) {
+  const input = h("input", { testid: "new-plan-input", class: "hidden" });
+  const create = h("button", {
+    testid: "new-plan-create",
+    class: "hidden",
+    onclick: async () => {
+      const { id } = await api("POST", "/api/plans", { name: input.value });
+      location.assign(`/plan/${id}/dashboard`);
+    },
+  }, "Create");
+  const start = h("button", {
+    testid: "create-new-plan-button",
+    onclick: () => [input, create].forEach((el) => el.classList.remove("hidden")),
+  }, "Create new plan");
+  renderShell(profile, null, h("div", {}, start, input, create));
+}
+
+async function renderArtifact(profile, plan, artifactId) {
+  let artifact = await api("GET", `/api/artifacts/${artifactId}`);
+
+  const title = h("div", { testid: "page-title", class: "page-title", contenteditable: "true" }, h("span", {}, artifact.title));
+  title.addEventListener("keydown", async (e) => {
+    if (e.key !== "Enter") return;
+    e.preventDefault();
+    const text = title.innerText.trim();
+    title.replaceChildren(h("span", {}, text));
+    await api("PUT", `/api/artifacts/${artifactId}/title`, { title: text });
+    await refreshLeftnav(plan);
+  });
+
+  const content = [title];
+  let editor = null;
+  if (artifact.type === "Document") {
+    editor = h("div", { contenteditable: "true", class: "editable" });
+    content.push(h("div", { testid: "order-editor" }, editor));
+  }
+  renderShell(profile, plan, content);
+  if (editor) syncDocument(artifact, editor);
+}
+
+// Keeps the order editor in sync with the server: local edits are sent as one
+// splice over the paragraph list, remote edits arrive through a long poll.
+function syncDocument(artifact, editor) {
+  let synced = [...artifact.paragraphs];
+  let version = artifact.version;
+  let timer = null;
+
+  const paragraphsOf = () => [...editor.children].map((p) => p.innerText.replace(/\n$/, ""));
+  const render = (paragraphs) => editor.replaceChildren(...paragraphs.map((text) => h("p", { testid: "typed-content" }, text)));
+  render(synced);
+
+  const push = async () => {
+    const current = paragraphsOf();
+    let start = 0;
+    while (start < current.length && start < synced.length && current[start] === synced[start]) start++;
+    let endCurrent = current.length, endSynced = synced.length;
+    while (endCurrent > start && endSynced > start && current[endCurrent - 1] === synced[endSynced - 1]) {
+      endCurrent--;
+      endSynced--;
+    }
+    if (start === endCurrent && start === endSynced) return;
+    synced = current;
+    await api("POST", `/api/artifacts/${artifact.id}/splice`, {
+      index: start, delete: endSynced - start, insert: current.slice(start, endCurrent),
+    });
+  };
+  editor.addEventListener("input", () => {
+    clearTimeout(timer);
+    timer = setTimeout(push, 200);
+  });
+  editor.addEventListener("keydown", (e) => {
+    if (e.key === "Escape") editor.blur();
+  });
+
+  const apply = (paragraphs) => {
+    const focused = document.activeElement === editor;
+    const nodes = [...editor.children];
+    if (!focused || nodes.length !== paragraphs.length) {
+      if (!focused) render(paragraphs);
+      return;
+    }
+    // While typing, only touch the paragraphs the caret isn't in
+    const caret = getSelection().anchorNode;
+    paragraphs.forEach((text, i) => {
+      if (!nodes[i].contains(caret) && nodes[i].innerText !== text) nodes[i].textContent = text;
+    });
+  };
+
+  (async function poll() {
+    while (true) {
+      try {
+        const fresh = await api("GET", `/api/artifacts/${artifact.id}/changes?since=${version}`);
+        if (fresh.version > version) {
+          version = fresh.version;
+          synced = [...fresh.paragraphs];
+          apply(fresh.paragraphs);
+        }
+      } catch (e) {
+        await new Promise((r) => setTimeout(r, 1000));
+      }
+    }
+  })();
+}
+
+async function main() {
+  const path = location.pathname;
+  if (path === "/login") return renderLogin();
+
+  root.replaceChildren(h("div", { testid: "loading-spinner" }, "Loading…"));
+  let profile;
+  try {
+    profile = await api("GET", "/api/auth/profile");
+  } catch (e) {
+    return location.assign("/login");
+  }
+
+  try {
+    const match = path.match(/^\/plan\/(\d+)(?:\/artifact\/(\d+))?/);
+    if (match) {
+      const plan = await api("GET", `/api/plans/${match[1]}`);
+      if (match[2]) return await renderArtifact(profile, plan, Number(match[2]));
+      return renderShell(profile, plan, h("h1", {}, `${plan.name} dashboard`));
+    }
+    if (path === "/new") return renderNewPlan(profile);
+    renderShell(profile, null, h("h1", {}, `Welcome, ${profile.name}`));
+  } catch (e) {
+    oops(e.message);
+  }
+}
+
+main();
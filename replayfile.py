@@ -0,0 +1,141 @@
+import json
+import time
+import itertools
+import gevent
+import websocket
+from locust import FastHttpUser, task, between, events, run_single_user
+from common.helpers.account_pool import load_plan_accounts
+from common.helpers.playwright import get_plan_id_from_url
+from common.helpers.recorder import load_scenario, render
+from common.helpers.logs import get_logger, setup_logging
+from config import *
+
+logger = get_logger("replayfile")
+
+SUPERVISOR_COOKIES_FILE = "supervisor_cookies.json"
+
+# Configure logging (queued, written off the event loop)
+setup_logging("load_test.log")
+
+# **Global Variables for the Replay Scenario**
+scenario = None
+shared_variables = {}
+account_cycle = None
+
+
+@events.test_start.add_listener
+def load_replay_scenario(environment, **kwargs):
+    """Reads the recorded scenario, shared plan ids and pooled accounts."""
+    global scenario, shared_variables, account_cycle
+
+    logger.info("🔍 Loading replay scenario...")
+    try:
+        scenario = load_scenario()
+        with open(SUPERVISOR_COOKIES_FILE, "r") as f:
+            data = json.load(f)
+
+        shared_variables = {
+            "plan_id": get_plan_id_from_url(data["shared_plan_url"]),
+            "order_id": get_plan_id_from_url(data["shared_order_url"]),
+        }
+        accounts = load_plan_accounts(data["shared_plan_url"])
+        if not accounts:
+            raise ValueError("the account pool has no accounts for the shared plan")
+        # Replay users don't hold on to an account, they take turns
+        account_cycle = itertools.cycle(accounts)
+
+        logger.info(
+            f"✅ Replay scenario loaded: {len(scenario['steps'])} steps, "
+            f"{len(accounts)} accounts"
+        )
+
+    except Exception as e:
+        logger.error(f"❌ Failed to load replay scenario: {e}")
+        raise SystemExit("Exiting due to missing replay scenario.")
+
+
+class OnebriefReplay(FastHttpUser):
+    """Replays a recorded Onebrief session at the protocol level, no browser needed."""
+
+    wait_time = between(5, 10)
+    host = HOST_URL
+
+    def on_start(self):
+        account = next(account_cycle)
+        self.variables = {
+            **shared_variables,
+            "user_id": account["user_data"]["id"],
+            "username": account["username"],
+            "email": account["email"],
+        }
+        self.cookie_header = "; ".join(
+            f"{c['name']}={c['value']}" for c in account["storage_state"]["cookies"]
+        )
+
+    def think(self, ms: int):
+        """Keeps the recorded gap between two steps, scaled by REPLAY_THINK_TIME_SCALE."""
+        if ms > 0 and REPLAY_THINK_TIME_SCALE > 0:
+            gevent.sleep(ms / 1000 * REPLAY_THINK_TIME_SCALE)
+
+    def replay_http(self, step: dict):
+        self.client.request(
+            step["method"],
+            render(step["path"], self.variables),
+            name=step["path"],  # The template, so stats group by endpoint
+            data=render(step["body"], self.variables),
+            headers={**step["headers"], "Cookie": self.cookie_header},
+        )
+
+    def replay_websocket(self, step: dict):
+        """Opens the recorded websocket and sends its frames on the recorded schedule."""
+        url = render(step["url"], self.variables)
+        start_time = time.time()
+        start = time.perf_counter()
+        ws = None
+        try:
+            ws = websocket.create_connection(url, header=[f"Cookie: {self.cookie_header}"])
+            self.fire_ws_event("connect", step["url"], start_time, start)
+
+            previous = 0
+            for frame in step["frames"]:
+                self.think(frame["offset_ms"] - previous)
+                previous = frame["offset_ms"]
+                payload = render(frame["payload"], self.variables)
+                sent_at, sent_perf = time.time(), time.perf_counter()
+                ws.send(payload)
+                self.fire_ws_event("send", step["url"], sent_at, sent_perf, len(payload))
+
+        except Exception as e:
+            self.fire_ws_event("connect", step["url"], start_time, start, exception=e)
+        finally:
+            if ws:
+                ws.close()
+
+    def fire_ws_event(self, kind, name, start_time, start, length=0, exception=None):
+        self.environment.events.request.fire(
+            request_type=f"WS {kind}",
+            name=name,
+            start_time=start_time,
+            response_time=(time.perf_counter() - start) * 1000,
+            response_length=length,
+            context={},
+            exception=exception,
+        )
+
+    @task
+    def replay_session(self):
+        """Replays every recorded step, websockets running alongside the HTTP calls."""
+        sockets = []
+        previous = 0
+        for step in scenario["steps"]:
+            self.think(step["offset_ms"] - previous)
+            previous = step["offset_ms"]
+            if step["type"] == "http":
+                self.replay_http(step)
+            else:
+                sockets.append(gevent.spawn(self.replay_websocket, step))
+        gevent.joinall(sockets)
+
+
+if __name__ == "__main__":
+    run_single_user(OnebriefReplay)
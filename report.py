@@ -0,0 +1,247 @@
+import os
+import sys
+import glob
+import html
+import sqlite3
+import argparse
+from collections import defaultdict
+from config import RESULTS_DIR
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_id(path: str) -> str:
+    """The run a results file belongs to, as recorded by the sink"""
+    db = sqlite3.connect(path)
+    try:
+        row = db.execute("SELECT value FROM run WHERE key = 'run_id'").fetchone()
+    finally:
+        db.close()
+    # Files written before run ids were recorded: run-<date>-<time>-<process>.sqlite
+    return row[0] if row and row[0] != "None" else "-".join(os.path.basename(path).split("-")[1:3])
+
+
+def open_results(paths: list[str]) -> sqlite3.Connection:
+    """One in-memory view over the samples of every results file"""
+    db = sqlite3.connect(":memory:")
+    db.execute(
+        "CREATE TABLE samples (ts REAL, request_type TEXT, name TEXT, response_time REAL,"
+        " response_length INTEGER, failed INTEGER, exception TEXT,"
+        " user_ordinal INTEGER, shard INTEGER, concurrency INTEGER)"
+    )
+    db.execute("CREATE TABLE gauges (ts REAL, name TEXT, value REAL, unit TEXT, concurrency INTEGER)")
+    for i, path in enumerate(paths):
+        db.execute(f"ATTACH DATABASE ? AS r{i}", (path,))
+        db.execute(f"INSERT INTO samples SELECT * FROM r{i}.samples")
+        has_gauges = db.execute(
+            f"SELECT 1 FROM r{i}.sqlite_master WHERE type = 'table' AND name = 'gauges'"
+        ).fetchone()
+        if has_gauges:  # Older files have none
+            db.execute(f"INSERT INTO gauges SELECT * FROM r{i}.gauges")
+        db.commit()
+        db.execute(f"DETACH DATABASE r{i}")
+    db.execute("CREATE INDEX samples_group ON samples (request_type, name, response_time)")
+    return db
+
+
+def grouped(db: sqlite3.Connection, key_sql: str, where: str, params: tuple) -> dict:
+    """Sorted response times per (type, name, key); the sort happens in SQLite"""
+    rows = db.execute(
+        f"SELECT request_type, name, {key_sql} AS k, response_time FROM samples"
+        f" WHERE response_time IS NOT NULL {where}"
+        " ORDER BY request_type, name, k, response_time",
+        params,
+    )
+    groups = defaultdict(list)
+    for request_type, name, key, response_time in rows:
+        groups[(request_type, name, key)].append(response_time)
+    return groups
+
+
+def summary_rows(db: sqlite3.Connection, where: str, params: tuple) -> list:
+    failures = dict(
+        ((t, n), f)
+        for t, n, f in db.execute(
+            f"SELECT request_type, name, SUM(failed) FROM samples WHERE 1 {where}"
+            " GROUP BY request_type, name",
+            params,
+        )
+    )
+    rows = []
+    for (request_type, name, _), times in grouped(db, "0", where, params).items():
+        rows.append(
+            [request_type, name, len(times), failures.get((request_type, name), 0)]
+            + [percentile(times, p) for p in PERCENTILES]
+            + [times[-1], sum(times) / len(times)]
+        )
+    return rows
+
+
+def bucketed_rows(db: sqlite3.Connection, key_sql: str, where: str, params: tuple) -> list:
+    rows = []
+    for (request_type, name, key), times in grouped(db, key_sql, where, params).items():
+        rows.append(
+            [request_type, name, key, len(times)]
+            + [percentile(times, p) for p in PERCENTILES]
+        )
+    return rows
+
+
+def gauge_rows(db: sqlite3.Connection, args) -> list:
+    where, params = "", ()
+    if args.name:
+        where, params = " WHERE name LIKE ?", (f"%{args.name}%",)
+    groups = defaultdict(list)
+    for name, unit, value in db.execute(
+        f"SELECT name, unit, value FROM gauges{where} ORDER BY name, value", params
+    ):
+        groups[(name, unit)].append(value)
+    rows = []
+    for (name, unit), values in groups.items():
+        stats = [sum(values) / len(values), percentile(values, 50), percentile(values, 95), values[-1]]
+        # Rates are often below 1, so gauges keep two decimals
+        rows.append([name, unit, len(values)] + [f"{v:.2f}" for v in stats])
+    return rows
+
+
+def format_cell(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.0f}"
+    return "" if value is None else str(value)
+
+
+def markdown_table(headers: list, rows: list) -> str:
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    for row in rows:
+        lines.append("| " + " | ".join(format_cell(v) for v in row) + " |")
+    return "\n".join(lines)
+
+
+def html_table(headers: list, rows: list) -> str:
+    head = "".join(f"<th>{html.escape(h)}</th>" for h in headers)
+    body = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(format_cell(v))}</td>" for v in row) + "</tr>"
+        for row in rows
+    )
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def build_report(db: sqlite3.Connection, args) -> list:
+    """(title, headers, rows) sections of the report"""
+    where, params = "", ()
+    if args.type:
+        where += f" AND request_type IN ({','.join('?' * len(args.type))})"
+        params += tuple(args.type)
+    if args.name:
+        where += " AND name LIKE ?"
+        params += (f"%{args.name}%",)
+
+    start, end, total, failed = db.execute(
+        f"SELECT MIN(ts), MAX(ts), COUNT(*), SUM(failed) FROM samples WHERE 1 {where}", params
+    ).fetchone()
+    gauges = gauge_rows(db, args)
+    gauge_sections = [
+        (
+            "Gauges (rates and counts, sampled at each flush)",
+            ["Name", "Unit", "Samples", "Mean", "p50", "p95", "Max"],
+            gauges,
+        )
+    ] if gauges else []
+    if not total:
+        return [("No samples", [], [])] + gauge_sections
+
+    pct_headers = [f"p{p} (ms)" for p in PERCENTILES]
+    return [
+        (
+            f"Summary: {total} samples, {failed or 0} failures, {end - start:.0f}s",
+            ["Type", "Name", "Count", "Failures"] + pct_headers + ["Max (ms)", "Mean (ms)"],
+            summary_rows(db, where, params),
+        ),
+        (
+            f"Percentiles per {args.bucket}s (bucket start, seconds into the run)",
+            ["Type", "Name", "Bucket (s)", "Count"] + pct_headers,
+            bucketed_rows(
+                db,
+                f"CAST((ts - {start}) / {args.bucket} AS INTEGER) * {args.bucket}",
+                where,
+                params,
+            ),
+        ),
+        (
+            f"Latency vs concurrency (buckets of {args.concurrency_bucket} users)",
+            ["Type", "Name", "Users", "Count"] + pct_headers,
+            bucketed_rows(
+                db,
+                f"CAST(concurrency / {args.concurrency_bucket} AS INTEGER) * {args.concurrency_bucket}",
+                where + " AND concurrency IS NOT NULL",
+                params,
+            ),
+        ),
+    ] + gauge_sections
+
+
+def render(sections: list, fmt: str) -> str:
+    if fmt == "html":
+        parts = ["<html><head><meta charset='utf-8'><title>Load test report</title>",
+                 "<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:2em}"
+                 "td,th{border:1px solid #ccc;padding:2px 8px;text-align:right}</style></head><body>",
+                 "<h1>Load test report</h1>"]
+        for title, headers, rows in sections:
+            parts.append(f"<h2>{html.escape(title)}</h2>")
+            if rows:
+                parts.append(html_table(headers, rows))
+        parts.append("</body></html>")
+        return "\n".join(parts)
+
+    parts = ["# Load test report"]
+    for title, headers, rows in sections:
+        parts.append(f"\n## {title}\n")
+        if rows:
+            parts.append(markdown_table(headers, rows))
+    return "\n".join(parts) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Percentile report over results sink files")
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help=f"Results files (default: the newest run in {RESULTS_DIR}/, all its processes)",
+    )
+    parser.add_argument("--bucket", type=int, default=60, help="Seconds per time bucket")
+    parser.add_argument("--concurrency-bucket", type=int, default=10, help="Users per bucket")
+    parser.add_argument("--type", action="append", help="Only these request types (repeatable)")
+    parser.add_argument("--name", help="Only names containing this text")
+    parser.add_argument("--format", choices=("md", "html"), default="md")
+    parser.add_argument("-o", "--output", help="Write here instead of stdout")
+    args = parser.parse_args()
+
+    files = args.files
+    if not files:
+        runs = sorted(glob.glob(os.path.join(RESULTS_DIR, "run-*.sqlite")))
+        if not runs:
+            sys.exit(f"No results files in {RESULTS_DIR}/")
+        # Every process of a run records the run id the master gave it
+        runs_by_file = {f: run_id(f) for f in runs}
+        newest = max(runs_by_file.values())
+        files = [f for f, run in runs_by_file.items() if run == newest]
+
+    report = render(build_report(open_results(files), args), args.format)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+        print(f"📄 Report written to {args.output} ({len(files)} results files)")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,112 @@
+import os
 import json
 import asyncio
-import logging
-from playwright.async_api import async_playwright
+import argparse
+from playwright.async_api import async_playwright, Browser
 from common.helpers.playwright import *
+from common.helpers.account_pool import provision_account_pool
+from common.helpers.plan_linker import PlanLinkError
+from common.helpers.interception import apply_interception_profile, interception_summary
+from common.helpers.shards import create_shards, load_shard_manifest, save_shard_manifest
+from common.helpers.logs import get_logger, setup_logging
 from config import *
 
+logger = get_logger("setup")
+
 SUPERVISOR_COOKIES_FILE = "supervisor_cookies.json"
 
-# Configure logging
-logging.basicConfig(
-    filename="supervisor_setup.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+# Configure logging (queued, written off the event loop)
+setup_logging("supervisor_setup.log")
 
 
-async def supervisor_setup():
-    """Handles supervisor login and batch user registration."""
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        supervisor_page = await browser.new_page(**DEFAULT_BROWSER_OPTIONS)
+def load_previous_setup() -> dict:
+    """Reads the data of the last setup run, or returns an empty dict"""
+    if not os.path.exists(SUPERVISOR_COOKIES_FILE):
+        return {}
+    with open(SUPERVISOR_COOKIES_FILE, "r") as f:
+        return json.load(f)
+
+
+async def open_supervisor_page(browser: Browser, previous: dict):
+    """Opens a supervisor page, reusing the stored session while it is valid.
+
+    Returns the page and the supervisor's profile.
+    """
+    supervisor_page = await browser.new_page(**DEFAULT_BROWSER_OPTIONS)
+    await apply_interception_profile(supervisor_page.context)
+
+    if previous.get("auth_cookies"):
+        await supervisor_page.context.add_cookies(previous["auth_cookies"])
+        supervisor_user = await get_user_data(supervisor_page, use_cache=False)
+        if supervisor_user:
+            logger.info("♻️ Stored supervisor session is still valid, skipping login")
+            return supervisor_page, supervisor_user
+        logger.info("⌛ Stored supervisor session expired")
+        await supervisor_page.context.clear_cookies()
 
-        logging.info("🚀 Logging in as Supervisor...")
-        await login_supervisor(supervisor_page)
+    logger.info("🚀 Logging in as Supervisor...")
+    await login_supervisor(supervisor_page)
+    return supervisor_page, await get_user_data(supervisor_page, use_cache=False)
 
-        # Persist this data in a JSON file
-        supervisor_user = await get_user_data(supervisor_page)
 
-        # Clock how long it takes to create a blank plan
-        t1 = time.time()
-        shared_plan_url = await create_plan(supervisor_page, f"TP - {get_ts_string()}")
-        t2 = time.time()
-        time_to_create_plan = t2 - t1
-        logging.info(f"Plan created in {time_to_create_plan:.2f} seconds")
+def reusable_shards(previous: dict, supervisor_user: dict) -> list[dict]:
+    """The previous run's shards, if they belong to this supervisor and match PLAN_SHARDS"""
+    if not supervisor_user or previous.get("supervisor_user", {}).get("id") != supervisor_user["id"]:
+        return []
+    shards = load_shard_manifest() or (
+        [
+            {
+                "index": 0,
+                "plan_url": previous["shared_plan_url"],
+                "plan_id": get_plan_id_from_url(previous["shared_plan_url"]),
+                "order_url": previous["shared_order_url"],
+                "time_to_create_plan": previous.get("time_to_create_plan"),
+            }
+        ]
+        if previous.get("shared_plan_url")
+        else []
+    )
+    if shards and shards[0]["plan_url"] != previous.get("shared_plan_url"):
+        return []  # The manifest is from another run
+    return shards if len(shards) == PLAN_SHARDS else []
+
+
+async def supervisor_setup(reuse_plan: bool = SETUP_REUSE_PLAN, headless: bool = SETUP_HEADLESS):
+    """Handles supervisor login and batch user registration.
+
+    Safe to rerun: a valid stored supervisor session is reused, and with
+    `reuse_plan` so are the plans and orders of the previous run.
+    """
+    previous = load_previous_setup()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        supervisor_page, supervisor_user = await open_supervisor_page(browser, previous)
+
+        shards = reusable_shards(previous, supervisor_user) if reuse_plan else []
+        if shards:
+            logger.info(f"♻️ Reusing {len(shards)} plans from the previous run")
+        else:
+            # Create the plans and their shared orders, each in its own context.
+            # Shard 0 is "the" shared plan of a single-plan run.
+            shards = await create_shards(browser, await supervisor_page.context.storage_state())
+            save_shard_manifest(shards)
 
-        shared_order_url = await create_special_order(supervisor_page)
+            # Link the ADDITIONAL_USER_IDS to every new plan
+            for shard in shards:
+                for user_id in ADDITIONAL_USER_IDS:
+                    try:
+                        await link_user_to_plan_api(supervisor_page, user_id, shard["plan_id"])
+                    except PlanLinkError:
+                        pass  # Logged; these users are only for looking at the run
 
-        await title_page(supervisor_page, "Shared Order")
+        shared_plan_url = shards[0]["plan_url"]
+        shared_order_url = shards[0]["order_url"]
 
         # Also persist the cookies for later use in Locust
         auth_cookies = await supervisor_page.context.cookies()
         supervisor_data = {
             "shared_plan_url": shared_plan_url,
-            "time_to_create_plan": f"{time_to_create_plan:.2f} seconds",
+            "time_to_create_plan": shards[0]["time_to_create_plan"],
             "shared_order_url": shared_order_url,
             "auth_cookies": auth_cookies,
             "supervisor_user": supervisor_user,
@@ -51,13 +115,34 @@ async def supervisor_setup():
         with open(SUPERVISOR_COOKIES_FILE, "w") as f:
             json.dump(supervisor_data, f, indent=2)
 
-        # Lastly link the ADDITIONAL_USER_IDS to the plan
-        plan_id = get_plan_id_from_url(shared_plan_url)
-        for user_id in ADDITIONAL_USER_IDS:
-            await link_user_to_plan_api(supervisor_page, user_id, plan_id)
+        # Pre-register the Locust accounts so users can skip the sign-up form.
+        # Accounts of the previous run are reused and only linked where needed.
+        if ACCOUNT_POOL_SIZE > 0:
+            await provision_account_pool(
+                browser, supervisor_page, [shard["plan_url"] for shard in shards]
+            )
 
-        logging.info(f"✅ Supervisor setup complete. Shared plan: {shared_plan_url}")
+        for line in interception_summary():
+            logger.info(line)
+        logger.info(
+            f"✅ Supervisor setup complete. Shared plan: {shared_plan_url} ({len(shards)} shards)"
+        )
+        return supervisor_data
 
 
 if __name__ == "__main__":
-    asyncio.run(supervisor_setup())
+    parser = argparse.ArgumentParser(description="Prepares the supervisor, plans and accounts")
+    parser.add_argument(
+        "--reuse-plan",
+        action="store_true",
+        default=SETUP_REUSE_PLAN,
+        help="Keep the plans and orders of the previous run",
+    )
+    parser.add_argument(
+        "--headful",
+        action="store_true",
+        default=not SETUP_HEADLESS,
+        help="Show the setup browser",
+    )
+    args = parser.parse_args()
+    asyncio.run(supervisor_setup(reuse_plan=args.reuse_plan, headless=not args.headful))
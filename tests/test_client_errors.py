@@ -0,0 +1,30 @@
+import asyncio
+from common.helpers import client_errors
+from common.helpers.client_errors import _on_client_error, drain_client_errors
+
+
+class StubPage:
+    """A page whose document can be replaced; Python's buffer outlives it"""
+
+    async def evaluate(self, expression):
+        return 0
+
+
+def report(page, kind: str, at: float):
+    _on_client_error({"page": page}, {"kind": kind, "message": "boom", "at": at, "path": "/"})
+
+
+def test_errors_reported_before_a_navigation_are_drained_after_it():
+    page = StubPage()
+    report(page, "uncaught", at=2000)  # On the artifact page, before page.goto back
+    report(page, "console", at=500)  # From before the action started
+    assert asyncio.run(drain_client_errors(page, since_ms=1000)) == 1
+    assert asyncio.run(drain_client_errors(page, since_ms=1000)) == 0
+
+
+def test_errors_over_the_buffer_count_as_dropped(monkeypatch):
+    monkeypatch.setattr(client_errors, "CLIENT_ERROR_BUFFER", 2)
+    page = StubPage()
+    for at in range(5):
+        report(page, "console", at=1000 + at)
+    assert asyncio.run(drain_client_errors(page, since_ms=1000)) == 5
@@ -0,0 +1,28 @@
+import json
+from common.helpers.logs import redact
+
+
+def test_redacts_dict_repr():
+    logged = str({"username": "u1", "password": "hunter2", "confirm-password": "hunter2"})
+    assert redact(logged) == "{'username': 'u1', 'password': '***', 'confirm-password': '***'}"
+
+
+def test_redacts_json_with_escaped_quotes():
+    logged = json.dumps({"password": 'p"q', "token": "a\\\"b\\c"})
+    assert redact(logged) == '{"password": "***", "token": "***"}'
+
+
+def test_redacts_dict_repr_with_escaped_quotes():
+    logged = str({"password": "it's"})  # repr switches to double quotes
+    assert redact(logged) == '{\'password\': "***"}'
+    assert redact(r"{'password': 'it\'s secret'}") == "{'password': '***'}"
+
+
+def test_redacts_cookie_values():
+    logged = str([{"name": "session", "value": "abc\"def", "domain": "x"}])
+    assert redact(logged) == "[{'name': 'session', 'value': '***', 'domain': 'x'}]"
+
+
+def test_redacts_form_bodies():
+    assert redact("username=u1&password=p%40ss&next=/") == "username=u1&password=***&next=/"
+    assert redact("POST /login?password=secret") == "POST /login?password=***"
@@ -0,0 +1,45 @@
+import asyncio
+from common.helpers.network import NetworkTelemetry
+
+
+class StubRequest:
+    """What NetworkTelemetry reads of a Playwright request"""
+
+    resource_type = "fetch"
+    method = "GET"
+    url = "https://elsewhere.test/api/brief/123"
+    timing = {"responseEnd": 42.0}
+
+    def __init__(self, body_size: int):
+        self.body_size = body_size
+        self.sizes_calls = 0
+
+    async def sizes(self):
+        self.sizes_calls += 1
+        return {"responseBodySize": self.body_size, "responseHeadersSize": 100}
+
+
+class StubResponse:
+    status = 200
+
+    def __init__(self, request: StubRequest, headers: dict):
+        self.request = request
+        self.headers = headers
+
+
+def finish(telemetry: NetworkTelemetry, request: StubRequest, headers: dict) -> list:
+    telemetry._on_response(StubResponse(request, headers))
+    asyncio.run(telemetry._on_finished(request))
+    return telemetry._samples[("GET", "elsewhere.test/api/brief/{id}")]
+
+
+def test_bytes_come_from_content_length():
+    request = StubRequest(body_size=999)
+    assert finish(NetworkTelemetry(), request, {"content-length": "512"}) == [(42.0, 512, None)]
+    assert request.sizes_calls == 0
+
+
+def test_bytes_without_content_length_come_from_the_request_sizes():
+    request = StubRequest(body_size=2048)  # e.g. a chunked, gzipped response
+    assert finish(NetworkTelemetry(), request, {}) == [(42.0, 2048, None)]
+    assert request.sizes_calls == 1
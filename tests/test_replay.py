@@ -0,0 +1,43 @@
+import json
+import pytest
+
+
+@pytest.fixture
+def replay_files(tmp_path, monkeypatch):
+    """Setup files of a sharded run in a scratch working directory"""
+    monkeypatch.chdir(tmp_path)
+    # replayfile sets up logging on import; pytest's captured stdout is gone by exit
+    monkeypatch.setattr("common.helpers.logs.LOG_CONSOLE", False)
+    (tmp_path / "supervisor_cookies.json").write_text(
+        json.dumps(
+            {
+                "shared_plan_url": "https://onebrief.test/plan/11",
+                "shared_order_url": "https://onebrief.test/plan/11/order/21",
+            }
+        )
+    )
+    (tmp_path / "replay_scenario.json").write_text(json.dumps({"steps": []}))
+    account = {"username": "u", "email": "u@x", "user_data": {"id": 1}, "storage_state": {}}
+    (tmp_path / "account_pool.json").write_text(
+        json.dumps(
+            {
+                "shared_plan_url": "https://onebrief.test/plan/11",
+                "accounts": [
+                    {**account, "username": "both", "plan_ids": [11, 12]},
+                    {**account, "username": "other shard", "plan_ids": [12]},
+                    {**account, "username": "before sharding", "plan_id": 11},
+                ],
+            }
+        )
+    )
+    return tmp_path
+
+
+def test_replay_uses_the_accounts_linked_to_the_shared_plan(replay_files):
+    import replayfile  # Imported here, so its log file lands in the scratch directory
+
+    replayfile.load_replay_scenario(environment=None)
+
+    first_cycle = [next(replayfile.account_cycle)["username"] for _ in range(2)]
+    assert sorted(first_cycle) == ["before sharding", "both"]
+    assert replayfile.shared_variables == {"plan_id": 11, "order_id": 21}
@@ -0,0 +1,69 @@
+import copy
+import pytest
+from common.helpers.scenario import DEFAULT_SCENARIO, ScenarioConfigError, validate_scenario
+
+
+def scenario(**changes) -> dict:
+    """The default scenario with `changes` applied to its top level"""
+    return {**copy.deepcopy(DEFAULT_SCENARIO), **changes}
+
+
+def with_action(name: str, **spec) -> dict:
+    """The default scenario with one action replaced"""
+    result = scenario()
+    result["actions"][name] = spec
+    return result
+
+
+def test_accepts_the_default_scenario():
+    assert validate_scenario(scenario()) is not None
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        with_action("edit order", weight=1, params={"edits": -3}),
+        with_action("edit order", weight=1, params={"edits": 0}),
+        with_action("card library", weight=1, params={"min_cards": 0, "max_cards": 0}),
+        with_action("card library", weight=1, params={"min_cards": 3, "max_cards": 2}),
+        with_action("edit order", weight=1, params={"edits": True}),
+    ],
+)
+def test_rejects_bad_counts(bad):
+    with pytest.raises(ScenarioConfigError):
+        validate_scenario(bad)
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        with_action("random artifact", weight=True),
+        scenario(iterations=True),
+        scenario(iterations={"min": True, "max": 3}),
+        scenario(pacing=False),
+    ],
+)
+def test_rejects_bools_as_numbers(bad):
+    with pytest.raises(ScenarioConfigError):
+        validate_scenario(bad)
+
+
+@pytest.mark.parametrize(
+    "think_time",
+    [
+        {"distribution": "exponential", "mean": 0},
+        {"distribution": "exponential", "mean": -1},
+        {"distribution": "uniform", "min": 2, "max": 1},
+        {"distribution": "constant", "seconds": True},
+    ],
+)
+def test_rejects_bad_think_times(think_time):
+    with pytest.raises(ScenarioConfigError):
+        validate_scenario(scenario(think_time=think_time))
+
+
+def test_accepts_zero_weights_and_a_positive_mean():
+    ok = with_action("random artifact", weight=0)
+    ok["think_time"] = {"distribution": "exponential", "mean": 2}
+    ok["pacing"] = 1
+    assert validate_scenario(ok) is ok